@@ -1,362 +1,1652 @@
+import argparse
+import gzip
+import hashlib
 import json
 import re
 import sys
 import os
 import random
-import string
-import requests
-from datetime import datetime
-# from visualize import visualize_region_data, visualize_summary_data
+import signal
+import threading
+from datetime import date, datetime
+from functools import lru_cache, partial
 import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+import incident_diff
+import incident_index
+import rankings
+import rollups
+from collections import deque
+from itertools import chain, islice
+from json_files import atomic_file, write_json
 
-# Optional: Only import PyPDF2 if needed
+# requests, PyPDF2, the process pool and the history store (sqlite3) are imported by
+# the code paths that use them (see load_pypdf2), so parsing a text report never pays for them.
+# scripts/check_import_time.py keeps this module's import within a startup budget.
+
+# Optional: per-stage CPU and peak RSS metrics need the Unix-only resource module
 try:
-    import PyPDF2
+    import resource
 except ImportError:
-    PyPDF2 = None
+    resource = None
+
+# Optional: .br outputs are only written when brotli is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 data_dir = 'data'
 today = datetime.utcnow().strftime('%Y%m%d')
 
 default_url = "https://www.nifc.gov/nicc-files/sitreprt.pdf"
 
-def download_pdf(url, save_dir):
+# Extracted PDF text is cached next to this script so Fire_Sample.py and seed_data.py share it.
+# Bump EXTRACTOR_VERSION whenever the extraction output changes to invalidate old entries.
+EXTRACTOR_VERSION = 1
+default_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pdf_text')
+default_cache_max_bytes = 256 * 1024 * 1024
+
+def download_pdf(url, save_dir, session=None):
+    """
+    Downloads the report into save_dir and returns its path, or None when the server
+    reports it has not changed since the copy already saved there.
+    The ETag/Last-Modified validators are kept in download_validators.json next to the PDF
+    and sent back as If-None-Match/If-Modified-Since on the next call. The body is
+    streamed to a temp file and renamed into place, so a failed download never
+    replaces a good copy.
+    """
     os.makedirs(save_dir, exist_ok=True)
     today = datetime.utcnow().strftime('%Y%m%d')
     filename = f'fire_summary_{today}.pdf'
     filepath = os.path.join(save_dir, filename)
-    response = requests.get(url)
-    response.raise_for_status()
-    with open(filepath, 'wb') as f:
-        f.write(response.content)
+    validators_path = os.path.join(save_dir, 'download_validators.json')
+
+    headers = {}
+    if os.path.exists(filepath) and os.path.exists(validators_path):
+        with open(validators_path, 'r', encoding='utf-8') as f:
+            validators = json.load(f)
+        if validators.get('url') == url:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+    if session is None:
+        import requests
+        session = requests
+    with session.get(url, headers=headers, stream=True, timeout=60) as response:
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        tmp_path = f'{filepath}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        validators = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+    with open(validators_path, 'w', encoding='utf-8') as f:
+        json.dump(validators, f, indent=2)
     return filepath
 
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def same_content(path_a, path_b):
+    return os.path.getsize(path_a) == os.path.getsize(path_b) and file_digest(path_a) == file_digest(path_b)
+
+def staging_dir_for(data_dir):
+    """
+    Returns a fresh staging directory beside data_dir (hidden, so the dated-folder
+    globs in scripts/ ignore it) on the same filesystem, so it can be renamed into place.
+    """
+    parent, name = os.path.split(os.path.abspath(data_dir))
+    os.makedirs(parent, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=f'.{name}.staging-', dir=parent)
+    # mkdtemp creates 0700; the published day must stay readable by the web server
+    os.chmod(staging_dir, 0o755)
+    return staging_dir
+
+def publish_outputs(staging_dir, data_dir, keep=()):
+    """
+    Moves a finished run from staging_dir into data_dir without readers ever seeing a
+    missing or half-written day. A new day is published with one atomic directory rename.
+    For an existing day, each file is swapped in with an atomic os.replace, and only if
+    its content changed; unchanged files keep their mtime so HTTP caching stays valid.
+    Files from the previous run that were not produced again are removed last, except
+    the paths in keep. staging_dir is consumed.
+    """
+    if not os.path.exists(data_dir):
+        os.rename(staging_dir, data_dir)
+        return
+    published = set()
+    for root, dirs, files in os.walk(staging_dir):
+        rel_root = os.path.relpath(root, staging_dir)
+        target_root = os.path.normpath(os.path.join(data_dir, rel_root))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            staged = os.path.join(root, name)
+            target = os.path.join(target_root, name)
+            published.add(os.path.abspath(target))
+            if os.path.isfile(target) and same_content(staged, target):
+                continue
+            os.replace(staged, target)
+    keep = {os.path.abspath(path) for path in keep} | published
+    for root, dirs, files in os.walk(data_dir, topdown=False):
+        for name in files:
+            path = os.path.abspath(os.path.join(root, name))
+            if path not in keep:
+                os.remove(path)
+        if root != data_dir and not os.listdir(root):
+            os.rmdir(root)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
 def is_url(path):
     return path.startswith('http://') or path.startswith('https://')
 
-def extract_text_from_pdf(pdf_path):
-    if PyPDF2 is None:
-        raise ImportError("PyPDF2 is required to extract text from PDF files.")
-    text = ""
+def load_pypdf2():
+    """
+    Imports PyPDF2 on first use, so text reports never load it.
+    """
+    try:
+        import PyPDF2
+    except ImportError:
+        raise ImportError("PyPDF2 is required to extract text from PDF files.") from None
+    return PyPDF2
+
+def extract_page_range(pdf_path, start, stop):
+    """
+    Extracts the text of pages [start, stop) from the PDF. Each call opens its own
+    reader so page ranges can be handed to separate worker processes.
+    """
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = load_pypdf2().PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() for i in range(start, stop)]
+
+# Page ranges handed to each extraction worker when streaming; small ranges keep
+# only a few pages in flight while the parser consumes them in order
+stream_chunk_pages = 8
+
+def iter_extracted_pages(pdf_path, workers=1):
+    """
+    Yields the extracted text of every page, in page order.
+    With workers > 1 (0 means one per CPU) contiguous page ranges are extracted in a
+    process pool, with at most two ranges per worker in flight at a time.
+    """
+    PyPDF2 = load_pypdf2()
+    if workers == 0:
+        workers = os.cpu_count() or 1
     with open(pdf_path, 'rb') as file:
         pdf_reader = PyPDF2.PdfReader(file)
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
+        page_count = len(pdf_reader.pages)
+        if min(workers, page_count) <= 1:
+            for page in pdf_reader.pages:
+                yield page.extract_text()
+            return
+    from concurrent.futures import ProcessPoolExecutor
+    chunk = min(-(-page_count // workers), stream_chunk_pages)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start in range(0, page_count, chunk):
+            pending.append(pool.submit(extract_page_range, pdf_path, start, min(start + chunk, page_count)))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def extract_pages_from_pdf(pdf_path, workers=1):
+    """
+    Returns the extracted text of every page, in page order (see iter_extracted_pages).
+    """
+    return list(iter_extracted_pages(pdf_path, workers))
+
+def pdf_cache_key(pdf_path):
+    """
+    Returns the cache key for a PDF: the SHA-256 of its content plus the extractor version.
+    """
+    return f"{file_digest(pdf_path)}-v{EXTRACTOR_VERSION}-pypdf2-{load_pypdf2().__version__}"
+
+def cache_entry_path(cache_dir, key):
+    return os.path.join(cache_dir, f'{key}.jsonl')
+
+def read_cached_pages(file):
+    with file:
+        for line in file:
+            yield json.loads(line)
+
+def iter_cached_pages(cache_dir, key):
+    """
+    Returns an iterator over the cached page texts for key, or None on a miss.
+    A hit refreshes the entry's mtime, which eviction uses as its recency.
+    """
+    path = cache_entry_path(cache_dir, key)
+    try:
+        file = open(path, 'r', encoding='utf-8')
+    except OSError:
+        return None
+    os.utime(path)
+    return read_cached_pages(file)
+
+def store_cached_pages(cache_dir, key, pages, max_bytes=default_cache_max_bytes):
+    """
+    Passes the page texts through, writing each one (a JSON string per line) to the
+    entry for key as it goes. Once every page is written the entry is moved into
+    place and least recently used entries are evicted until the cache fits in max_bytes.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_entry_path(cache_dir, key)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for page_text in pages:
+                f.write(json.dumps(page_text) + '\n')
+                yield page_text
+    except BaseException:
+        # Extraction failed or the consumer stopped early; never cache a partial entry
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    evict_cached_pages(cache_dir, os.path.basename(path), max_bytes)
+
+def evict_cached_pages(cache_dir, keep_name, max_bytes):
+    entries = []
+    for name in os.listdir(cache_dir):
+        # .json entries predate the streamed .jsonl format; they age out the same way
+        if not name.endswith(('.json', '.jsonl')):
+            continue
+        try:
+            stat = os.stat(os.path.join(cache_dir, name))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep_name:
+            continue
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            continue
+        total -= size
+
+def iter_pdf_pages(pdf_path, workers=1, cache_dir=None, cache_max_bytes=default_cache_max_bytes):
+    """
+    Yields the text of each page of the PDF. With a cache_dir, page texts are looked
+    up by the PDF's content hash and only extracted (and stored as they stream) on a miss.
+    """
+    if cache_dir is None:
+        return iter_extracted_pages(pdf_path, workers)
+    key = pdf_cache_key(pdf_path)
+    pages = iter_cached_pages(cache_dir, key)
+    if pages is None:
+        pages = store_cached_pages(cache_dir, key, iter_extracted_pages(pdf_path, workers), cache_max_bytes)
+    return pages
+
+def join_pages(pages):
+    return ''.join([page_text + "\n" for page_text in pages if page_text])
+
+def extract_text_from_pdf(pdf_path, workers=1, cache_dir=None, cache_max_bytes=default_cache_max_bytes):
+    """
+    Returns the text of the PDF (see iter_pdf_pages for the cache).
+    """
+    return join_pages(iter_pdf_pages(pdf_path, workers, cache_dir, cache_max_bytes))
 
 def load_text_file(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return f.read()
 
-def random_tag(length=3):
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+precompressed_extensions = ('.json', '.txt')
 
-#Predictive Services Discussion:
-def parse_pred_services(lines, data_dir):
+def precompress_outputs(out_dir):
     """
-    Joins all lines after the line containing 'Predictive Services' into a single string,
-    saves it to predictive_summary.txt in the data_dir, and returns the string.
+    Writes a .gz sibling (and .br when the brotli package is installed) next to every
+    JSON/text output under out_dir, for nginx gzip_static/brotli_static.
+    The gzip header carries no timestamp, so unchanged outputs compress to identical
+    bytes and publish_outputs leaves them alone.
     """
-    for idx, line in enumerate(lines):
-        if 'Predictive Services' in line:
-            summary_lines = lines[idx+1:]
-            #replace each line with is an empty string with a new line
-            for i, line in enumerate(summary_lines):
-                if line.strip()  == '':
-                    summary_lines[i] = '\n\n'
+    for root, dirs, files in os.walk(out_dir):
+        for name in files:
+            if name.endswith(precompressed_extensions):
+                precompress_file(os.path.join(root, name))
 
-            summary_str = ''.join(summary_lines).strip()
-            out_path = os.path.join(data_dir, 'predictive_summary.txt')
-            with open(out_path, 'w', encoding='utf-8') as f:
-                f.write(summary_str)
-            return summary_str
-    return ''
+def precompress_file(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(f'{path}.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(f'{path}.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
 
+region_header_pattern = re.compile(r"Area.*\(PL\s*\d+\s*\)")
+region_marker_pattern = re.compile(r'Fire Activity and Teams Assigned\s+Totals')
 
-def parse_region_table(lines, region_name):
+# Table engine: a sitrep table row is a free-text left column (which may contain
+# spaces) followed by a fixed number of single-token columns anchored at the right.
+# A schema names those columns; compile_table_schema turns it into the lookup data
+# parse_table_rows needs, once at import, and every table shares that one loop.
+def compile_table_schema(schema):
     """
-    Parses the first table after the line 'Northwest Area (PL 3)' in the provided lines.
-    Uses the columns provided in the user selection.
+    schema: {'text_column': name, 'fixed_columns': [names, left to right],
+             'row_pattern': optional regex a data line must match,
+             'reverse_keys': emit row keys right to left (the published Region_* order)}
     """
+    fixed_columns = tuple(schema['fixed_columns'])
+    keys = (schema['text_column'],) + fixed_columns
+    row_pattern = schema.get('row_pattern')
+    return {
+        'name': schema['name'],
+        'columns': keys,
+        'fixed_count': len(fixed_columns),
+        'keys': tuple(reversed(keys)) if schema.get('reverse_keys') else keys,
+        'reverse_keys': bool(schema.get('reverse_keys')),
+        'row_pattern': re.compile(row_pattern) if row_pattern else None,
+    }
 
-    # Find the start of the region
-    start_idx = None
-    for i, line in enumerate(lines):
-        if region_name in line:
-            start_idx = i
-            break
-    if start_idx is None:
-        return []
-    # Find the first non-empty line after the header (should be the column header)
-    for j in range(start_idx+1, len(lines)):
-        if lines[j].strip():
-            header_idx = j
-            break
-    else:
-        return []
-    # Find the first occurrence of 'Incident Name' after the region header
-    header_start = None
-    for j in range(start_idx+1, len(lines)):
-        if 'Incident Name' in lines[j]:
-            header_start = j
-            break
-    if header_start is None:
-        return []
-    # Collect header lines from 'Incident Name' up to and including the first line containing 'Own'
-    header_lines = []
-    own_line_idx = None
-    for k in range(header_start, len(lines)):
-        line = lines[k].strip()
-        header_lines.append(line)
-        if 'Own' in line:
-            own_line_idx = k
-            break
-    if own_line_idx is None:
-        return []
-    # Data starts after the 'Own' line
-    data_start = own_line_idx + 1
-    # Flatten header lines and split into columns
-    header_str = ' '.join(header_lines)
-    header_str = re.sub(r'\s+', ' ', header_str)
-    columns = [
-        'Incident Name', 'Unit', 'Total Acres', 'Chge in Acres', '%' ,  'Ctn/Comp',
-        'Est', 'Total PPL', 'Chge in PPL', 'Crw', 'Eng', 'Heli', 'Strc Lost', '$$ CTD', 'Origin Own'
-    ]
-    data_rows = []
-    k = data_start
-    while k < len(lines):
-        line = lines[k].strip()
-        # Halt parsing if a blank line is encountered
-        if not line:
-            break
-        # If the first text is 'Incident', we've encountered a new header delimiter
-        if line.startswith('Incident'):
-            # Skip lines until the next 'Own' line is found
-            while k < len(lines) and 'Own' not in lines[k]:
-                k += 1
-            k += 1  # Move to the line after 'Own'
+def parse_table_rows(table, lines):
+    """
+    Tokenizes a section's data lines in one pass. Each line is split once from the
+    right into the fixed columns; whatever is left is the text column. Lines without
+    at least one text token plus every fixed column (wrapped names, notes) are
+    skipped, as are lines not matching the schema's row_pattern.
+    """
+    fixed_count = table['fixed_count']
+    keys = table['keys']
+    reverse_keys = table['reverse_keys']
+    row_match = table['row_pattern'].match if table['row_pattern'] else None
+    rows = []
+    append = rows.append
+    for line in lines:
+        if row_match is not None and not row_match(line):
             continue
-        # Stop if we hit another region or a summary line
-        if re.match(r'^[A-Z][a-z]+ Area', line) or line.startswith('Total'):
-            break
-        #if the line contains one token add it to the next line
-        if len(line.split()) == 1:
-            k += 1
+        parts = line.rsplit(None, fixed_count)
+        if len(parts) <= fixed_count:
             continue
+        parts[0] = ' '.join(parts[0].split())
+        if reverse_keys:
+            parts.reverse()
+        append(dict(zip(keys, parts)))
+    return rows
 
-        tokens = line.split()
-        if len(tokens) < len(columns):
-            k += 1
+table_schemas = {
+    schema['name']: compile_table_schema(schema) for schema in (
+        {
+            'name': 'region',
+            'text_column': 'Incident Name',
+            'fixed_columns': [
+                'Unit', 'Total Acres', 'Chge in Acres', '%', 'Ctn/Comp', 'Est', 'Total PPL',
+                'Chge in PPL', 'Crw', 'Eng', 'Heli', 'Strc Lost', '$$ CTD', 'Origin Own',
+            ],
+            'reverse_keys': True,
+        },
+        {
+            'name': 'gacc_summary',
+            'text_column': 'GACC',
+            'fixed_columns': [
+                'Incidents', 'Cumulative Acres', 'Crews', 'Engines', 'Helicopters',
+                'Total Personnel', 'Change in Personnel',
+            ],
+            # A GACC code (3-4 capitals) or the Total row, but not the 'GACC ...' header
+            'row_pattern': r'(?!GACC)(?:[A-Z]{3,4}|Total)\b',
+        },
+    )
+}
+
+# A region table ends at the next area header or at its 'Total' line
+table_end_pattern = re.compile(r'[A-Z][a-z]+ Area|Total')
+
+# Typed output: numeric columns converted once at ingest.
+# Anything that does not parse ('UNK', '---', 'NR', stray text from a wrapped row) becomes None.
+money_suffixes = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+
+@lru_cache(maxsize=4096)
+def to_int(value):
+    """
+    '1,234' -> 1234, '-74' -> -74, 'UNK' -> None
+    """
+    try:
+        return int(value.replace(',', ''))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def to_personnel(value):
+    """
+    Total PPL may be reported as 'X/Y'; the first number is the personnel count.
+    """
+    return to_int(value.split('/')[0])
+
+@lru_cache(maxsize=4096)
+def to_dollars(value):
+    """
+    '$$ CTD' values: '1.2M' -> 1200000, '500K' -> 500000, '25M' -> 25000000, 'NR' -> None
+    """
+    value = value.replace('$', '').replace(',', '')
+    multiplier = money_suffixes.get(value[-1:].upper(), 1)
+    if multiplier != 1:
+        value = value[:-1]
+    try:
+        return int(round(float(value) * multiplier))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def to_est_date(value, report_day):
+    """
+    'M/D' estimated containment date -> 'YYYY-MM-DD' in the report's year, rolled into
+    the next year when the month is more than six months before the report month.
+    """
+    parts = value.split('/')
+    if len(parts) != 2:
+        return None
+    month, day = to_int(parts[0]), to_int(parts[1])
+    if month is None or day is None:
+        return None
+    year = int(report_day[:4])
+    if month < int(report_day[4:6]) - 6:
+        year += 1
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+region_column_types = {
+    'Total Acres': to_int,
+    'Chge in Acres': to_int,
+    '%': to_int,
+    'Est': to_est_date,
+    'Total PPL': to_personnel,
+    'Chge in PPL': to_int,
+    'Crw': to_int,
+    'Eng': to_int,
+    'Heli': to_int,
+    'Strc Lost': to_int,
+    '$$ CTD': to_dollars,
+}
+
+summary_column_types = {
+    'Incidents': to_int,
+    'Cumulative Acres': to_int,
+    'Crews': to_int,
+    'Engines': to_int,
+    'Helicopters': to_int,
+    'Total Personnel': to_int,
+    'Change in Personnel': to_int,
+}
+
+def type_rows(rows, column_types, report_day):
+    """
+    Returns copies of the parsed string rows with the numeric columns converted,
+    in one pass over the table. Columns not in column_types are kept as strings.
+    """
+    converters = []
+    for col, convert in column_types.items():
+        if convert is to_est_date:
+            convert = partial(to_est_date, report_day=report_day)
+        converters.append((col, convert))
+    typed = []
+    for row in rows:
+        entry = dict(row)
+        for col, convert in converters:
+            value = entry.get(col)
+            if value is not None:
+                entry[col] = convert(value)
+        typed.append(entry)
+    return typed
+
+report_date_pattern = re.compile(r'([A-Z][a-z]+)\s+(\d{1,2})\s*,\s*(\d{4})')
+
+def report_date(lines):
+    """
+    Returns the report date from the document header as 'YYYYMMDD', or None if
+    no date like 'Saturday May 16, 2026' or 'Wednesday, July 23 , 2025' is found.
+    """
+    for line in lines[:5]:
+        match = report_date_pattern.search(line)
+        if not match:
             continue
-        # Traverse from the end, assign last N tokens to columns, rest to Incident Name
-        entry = {}
-        for i, col in enumerate(reversed(columns[1:])):
-            entry[columns[-(i+1)]] = tokens[-(i+1)]
-        incident_name_tokens = tokens[:len(tokens)-(len(columns)-1)]
-        entry[columns[0]] = ' '.join(incident_name_tokens)
-        data_rows.append(entry)
-        k += 1
-    return data_rows
-
-
-def parse_summary_table(file_text, data_dir, today):
-        # Extract all lines after 'Active Incident Resource Summary' up to and including the first 'Total' line
-    lines = file_text.splitlines()
-    collecting = False
-    summary_lines = []
-    for line in lines:
-        if not collecting:
-            if 'Active Incident Resource Summary' in line:
-                collecting = True
+        for fmt in ('%B %d %Y', '%b %d %Y'):
+            try:
+                return datetime.strptime(' '.join(match.groups()), fmt).strftime('%Y%m%d')
+            except ValueError:
+                continue
+    return None
+
+def iter_report_lines(file_path, workers=1, cache_dir=None, metrics=None):
+    """
+    Yields the report's lines a page (or, for text reports, a line) at a time, split
+    exactly as the whole text (pages joined by join_pages) would be by splitlines().
+    """
+    if os.path.splitext(file_path)[1].lower() == '.pdf':
+        if metrics is not None:
+            metrics['counts']['pages'] = 0
+        for page_text in timed_iter(metrics, 'extraction', iter_pdf_pages(file_path, workers, cache_dir)):
+            if metrics is not None:
+                metrics['counts']['pages'] += 1
+            if page_text:
+                yield from (page_text + "\n").splitlines()
+        return
+    with open(file_path, 'r', encoding='utf-8') as f:
+        # About 1 MB of lines per read; timing each line would cost more than reading it
+        for block in timed_iter(metrics, 'extraction', iter(partial(f.readlines, 1 << 20), [])):
+            for chunk in block:
+                # A blank line splits to nothing on its own but is a line of the whole text
+                yield from chunk.splitlines() or ['']
+
+gacc_by_area = {
+    'Alaska': 'AICC',
+    'Northwest': 'NWCC',
+    'Northern California': 'ONCC',
+    'Southern California': 'OSCC',
+    'Northern Rockies': 'NRCC',
+    'Great Basin': 'GBCC',
+    'Southwest': 'SWCC',
+    'Rocky Mountain': 'RMCC',
+    'Eastern': 'EACC',
+    'Southern': 'SACC',
+}
+
+def gacc_for_region(region_name):
+    """
+    'Southwest Area (PL 3)' -> 'SWCC'; None for names that are not a GACC area.
+    """
+    area = region_name.split(' Area', 1)[0].strip()
+    return gacc_by_area.get(area)
+
+def incident_rows(report):
+    """
+    Returns the typed incident rows of every GACC area in the report, each tagged
+    with 'Date', 'Region' and 'GACC'. Detected regions that are not GACC areas
+    (e.g. 'National Fire Activity:', which repeats the first area's table) are skipped.
+    """
+    rows = []
+    for region_name, typed_rows in report['typed_regions']:
+        gacc = gacc_for_region(region_name)
+        if gacc is None or not region_header_pattern.search(region_name):
             continue
-        # Start collecting after the header
-        summary_lines.append(line)
-        if line.strip().startswith('Total'):
-            break
+        for row in typed_rows:
+            rows.append(dict(row, Date=report['date'], Region=region_name, GACC=gacc))
+    return rows
 
-    # Remove header lines and split into lines
-    lines = [line.strip() for line in summary_lines if line.strip()]
-    # Only include lines that start with a region code (3-4 uppercase letters) or 'Total', but skip the header line 'GACC ...'
-    data_lines = [
-        line for line in lines
-        if (re.match(r'^(?:[A-Z]{3,4}|Total)\b', line) and not line.startswith('GACC'))
-    ]
+def load_day_report(day_dir):
+    """
+    Rebuilds the typed region and GACC summary tables of a published day from its
+    bundle, or from its per-file outputs for days written before bundles existed. Returns
+    a report with 'date', 'typed_summary' and 'typed_regions' (enough for incident_rows),
+    or None without region tables.
+    """
+    name = os.path.basename(os.path.normpath(day_dir))
+    bundle_path = os.path.join(day_dir, f'bundle_{name}.json')
+    if os.path.exists(bundle_path):
+        with open(bundle_path, 'r', encoding='utf-8') as f:
+            bundle = json.load(f)
+        header = bundle['daily_summary'].get('header', [])
+        region_key, tables = bundle['region_key'], bundle['regions']
+        summary = bundle['fire_summary']
+    else:
+        regions_dir = os.path.join(day_dir, 'regions')
+        key_path = os.path.join(regions_dir, f'region_key_{name}.json')
+        if not os.path.exists(key_path):
+            return None
+        with open(key_path, 'r', encoding='utf-8') as f:
+            region_key = json.load(f)
+        tables = {}
+        for idx in region_key:
+            region_path = os.path.join(regions_dir, f'Region_{idx}_{name}.json')
+            if os.path.exists(region_path):
+                with open(region_path, 'r', encoding='utf-8') as f:
+                    tables[idx] = json.load(f)
+        header = []
+        summary_path = os.path.join(day_dir, 'daily_summary.json')
+        if os.path.exists(summary_path):
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                header = json.load(f).get('header', [])
+        summary = []
+        summary_path = os.path.join(day_dir, f'fire_summary_{name}.json')
+        if os.path.exists(summary_path):
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+    day = report_date(header) or name
+    return {
+        'date': day,
+        'typed_summary': type_rows(summary, summary_column_types, day),
+        'typed_regions': [
+            (region_key[idx], type_rows(tables.get(idx, []), region_column_types, day))
+            for idx in sorted(region_key, key=int)
+        ],
+    }
+
+# Longest gap the day-over-day diff spans; reports are daily in season and weekly at
+# low preparedness levels
+diff_max_gap_days = 7
 
-    # Define the columns
-    columns = [
-        "GACC", "Incidents", "Cumulative Acres", "Crews", "Engines",
-        "Helicopters", "Total Personnel", "Change in Personnel"
+def load_previous_report(output_root, today, max_gap_days=diff_max_gap_days):
+    """
+    Loads the most recent dated output folder before today (see load_day_report), or
+    returns None when there is none within max_gap_days. A diff against an older day
+    (e.g. the end of last season) would list every fire since then as new or removed.
+    """
+    if not os.path.isdir(output_root):
+        return None
+    days = [
+        name for name in os.listdir(output_root)
+        if len(name) == 8 and name.isdigit() and name < today and os.path.isdir(os.path.join(output_root, name))
     ]
+    if not days:
+        return None
+    previous = max(days)
+    gap = datetime.strptime(today, '%Y%m%d') - datetime.strptime(previous, '%Y%m%d')
+    if gap.days > max_gap_days:
+        return None
+    return load_day_report(os.path.join(output_root, previous))
 
-    # Parse each data line
-    result = []
-    for line in data_lines:
-        tokens = line.split()
-        # Extract the last 7 columns in reverse order
-        if len(tokens) < 8:
-            # Not enough tokens, skip this line
-            continue
-        change_in_personnel = tokens[-1]
-        total_personnel = tokens[-2]
-        helicopters = tokens[-3]
-        engines = tokens[-4]
-        crews = tokens[-5]
-        cumulative_acres = tokens[-6]
-        incidents = tokens[-7]
-        gacc = ' '.join(tokens[:-7])
-        entry = {
-            "GACC": gacc,
-            "Incidents": incidents,
-            "Cumulative Acres": cumulative_acres,
-            "Crews": crews,
-            "Engines": engines,
-            "Helicopters": helicopters,
-            "Total Personnel": total_personnel,
-            "Change in Personnel": change_in_personnel
+def day_diff(report, previous):
+    """
+    The incidents that are new, removed or changed since the previous report, with
+    per-column deltas (see incident_diff.diff_incidents).
+    """
+    diff = {'date': report['date'], 'previous_date': previous['date']}
+    diff.update(incident_diff.diff_incidents(incident_rows(previous), incident_rows(report)))
+    return diff
+
+def write_day_diff(data_dir, today, report, previous, compact=False):
+    """
+    Writes day_diff as diff_<today>.json in data_dir and returns its path.
+    """
+    diff = day_diff(report, previous)
+    out_path = os.path.join(data_dir, f'diff_{today}.json')
+    write_json(out_path, diff, compact)
+    return out_path
+
+# Bump when the bundle layout changes so the frontend can tell which shape it received
+BUNDLE_VERSION = 1
+
+def build_bundle(today, header_data, summary_data, pred_services_text, region_key, region_tables, region_map):
+    """
+    The bundle_<today>.json document holding every per-day output, so a page load needs one
+    request. Each key mirrors one of the per-file outputs, which are still written:
+    daily_summary.json, fire_summary_<today>.json, predictive_summary.txt,
+    region_key_<today>.json, Region_<N>_<today>.json (under 'regions', keyed by N)
+    and region_summaries_<today>.json.
+    """
+    return {
+        'version': BUNDLE_VERSION,
+        'date': today,
+        'daily_summary': header_data,
+        'fire_summary': summary_data,
+        'predictive_summary': pred_services_text,
+        'region_key': region_key,
+        'regions': {str(idx): rows for idx, (name, rows) in enumerate(region_tables, 1)},
+        'region_summaries': region_map,
+    }
+
+# Run metrics: wall time, CPU time (including pool workers) and peak RSS per stage
+metrics_filename = 'run_metrics.json'
+metrics_log_filename = 'metrics.jsonl'
+metrics_log_max_lines = 2000
+
+def new_metrics(source):
+    return {
+        'started': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'source': source,
+        'stages': {},
+        'counts': {},
+    }
+
+def cpu_seconds():
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def peak_rss_kb():
+    """
+    Peak resident set size of this process so far, in KB (ru_maxrss is KB on Linux).
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# A stage's own peak RSS needs the high-water mark reset when the stage starts, which
+# Linux allows through /proc/self/clear_refs; the peak is then VmHWM when it ends. The
+# reset also lowers ru_maxrss, so the run's peak is kept across resets in
+# metrics['run_peak_rss_kb']. Elsewhere stages record no peak, only the run total.
+clear_refs_path = '/proc/self/clear_refs'
+proc_status_path = '/proc/self/status'
+
+def reset_high_water_rss():
+    with open(clear_refs_path, 'w') as f:
+        f.write('5')
+
+@lru_cache(maxsize=1)
+def per_stage_rss():
+    """
+    Whether the RSS high-water mark can be reset, so each stage measures its own peak.
+    """
+    return os.access(clear_refs_path, os.W_OK) and high_water_rss_kb() is not None
+
+def high_water_rss_kb():
+    """
+    Peak RSS since the last reset (VmHWM), in KB, or None when it cannot be read.
+    """
+    try:
+        with open(proc_status_path, 'rb') as f:
+            for line in f:
+                if line.startswith(b'VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def start_stage(metrics):
+    """
+    Starts a stage (or one slice of it): resets the RSS high-water mark, folding the
+    previous one into the run's peak, and returns the (wall, CPU) start times.
+    """
+    if per_stage_rss():
+        metrics['run_peak_rss_kb'] = max(metrics.get('run_peak_rss_kb') or 0, high_water_rss_kb() or 0)
+        reset_high_water_rss()
+    return time.perf_counter(), cpu_seconds()
+
+def stage_peak_rss_kb():
+    """
+    Peak RSS since the stage (slice) started, or None when stages are not measured apart.
+    """
+    return high_water_rss_kb() if per_stage_rss() else None
+
+@contextmanager
+def timed_stage(metrics, name):
+    """
+    Records the wall time, CPU time and peak RSS of the enclosed block into
+    metrics['stages'][name]. Does nothing when metrics is None.
+    """
+    if metrics is None:
+        yield
+        return
+    wall_start, cpu_start = start_stage(metrics)
+    try:
+        yield
+    finally:
+        metrics['stages'][name] = {
+            'wall_s': round(time.perf_counter() - wall_start, 6),
+            'cpu_s': round(cpu_seconds() - cpu_start, 6),
+            'peak_rss_kb': stage_peak_rss_kb(),
         }
-        result.append(entry)
 
-    # Save as JSON file
-    out_filename = os.path.join(data_dir, f'fire_summary_{today}.json')
-    with open(out_filename, 'w') as f:
-        json.dump(result, f, indent=2)
+def add_stage_time(metrics, name, wall_start, cpu_start):
+    """
+    Adds the wall and CPU time since wall_start/cpu_start (see start_stage) to
+    metrics['stages'][name] and raises its peak RSS to the slice's. For stages that
+    run in many short slices.
+    """
+    stage = metrics['stages'].setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0, 'peak_rss_kb': None})
+    stage['wall_s'] += time.perf_counter() - wall_start
+    stage['cpu_s'] += cpu_seconds() - cpu_start
+    peak = stage_peak_rss_kb()
+    if peak is not None:
+        stage['peak_rss_kb'] = max(stage['peak_rss_kb'] or 0, peak)
 
-    return result
+def timed_iter(metrics, name, items):
+    """
+    Yields from items, adding the time spent producing them to metrics['stages'][name].
+    Used for stages that are consumed lazily, such as streamed PDF extraction.
+    """
+    if metrics is None:
+        yield from items
+        return
+    items = iter(items)
+    while True:
+        wall_start, cpu_start = start_stage(metrics)
+        try:
+            item = next(items)
+        except StopIteration:
+            break
+        finally:
+            add_stage_time(metrics, name, wall_start, cpu_start)
+        yield item
 
-def parse_region_summary(lines, data_dir, today):
+def write_metrics(metrics, data_dir, output_root):
     """
-    For each region header, captures the lines between the header and the first line containing 'Incident' after it.
-    Returns a dict: {region_header: [lines_between_header_and_incident]}
+    Writes run_metrics.json into data_dir and appends the run to the rolling
+    <output_root>/metrics.jsonl, which keeps the last metrics_log_max_lines runs.
     """
-    import re
-    region_header_pattern = re.compile(r".*Area.*\(PL\s*\d+\s*\)")
-    region_map = {}
-    i = 0
-    # print('\n'.join(lines))
-    while i < len(lines):
-        line = lines[i]
-        header_match = region_header_pattern.search(line)
-        if header_match:
-            # print(line)
-            region_header = line.strip()
-            data_lines = []
-            i += 1
-            # Collect lines until we hit a line containing 'Incident' (case-insensitive)
-            while i < len(lines) and 'Incident Name' not in lines[i]:
-                data_lines.append(lines[i])
-                i += 1
-            region_map[region_header] = data_lines
+    stages = metrics['stages'].values()
+    for stage in stages:
+        stage['wall_s'] = round(stage['wall_s'], 6)
+        stage['cpu_s'] = round(stage['cpu_s'], 6)
+    peaks = [metrics.pop('run_peak_rss_kb', None), peak_rss_kb()] + [stage['peak_rss_kb'] for stage in stages]
+    peaks = [peak for peak in peaks if peak is not None]
+    metrics['total'] = {
+        'wall_s': round(sum(stage['wall_s'] for stage in stages), 6),
+        'cpu_s': round(sum(stage['cpu_s'] for stage in stages), 6),
+        'peak_rss_kb': max(peaks) if peaks else None,
+    }
+    write_json(os.path.join(data_dir, metrics_filename), metrics)
+
+    log_path = os.path.join(output_root, metrics_log_filename)
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(metrics, separators=(',', ':')) + '\n')
+    with open(log_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    if len(lines) > metrics_log_max_lines:
+        with atomic_file(log_path) as f:
+            f.writelines(lines[-metrics_log_max_lines:])
+
+# Streaming pipeline: the one report parser, used by main(), backfill() and
+# parse_report(). Report lines are fed once, in order and in small batches, to one
+# generator stage per output. Each stage keeps only its open section and emits its
+# output as soon as that section closes, then drops out; no stage sees the whole text
+# or line list. Stages receive (index of the batch's first line, [lines]). The
+# per-section parse functions (parse_summary_table, parse_region_table, ...) run a
+# single stage over a whole line list.
+#
+# Outputs go to a sink: emit(relative_path, data). file_sink writes them under a data
+# directory; parse_report's default discards them, so library callers get the parsed
+# report without touching the disk.
+stream_batch_lines = 512
+predictive_filename = 'predictive_summary.txt'
+
+def file_sink(data_dir, compact=False):
+    """
+    Returns emit(relative_path, data) writing each output under data_dir: .txt outputs
+    as text, everything else with write_json.
+    """
+    made_dirs = set()
+
+    def emit(relative_path, data):
+        path = os.path.join(data_dir, relative_path)
+        parent = os.path.dirname(path)
+        if parent not in made_dirs:
+            os.makedirs(parent, exist_ok=True)
+            made_dirs.add(parent)
+        if relative_path.endswith('.txt'):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
         else:
-            i += 1
-    # Optionally, save to file
-    regions_dir = os.path.join(data_dir, 'regions')
-    os.makedirs(regions_dir, exist_ok=True)  # Ensure the directory exists
-    out_path = os.path.join(regions_dir, f"region_summaries_{today}.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        import json
-        json.dump(region_map, f, indent=2)
-    return region_map
+            write_json(path, data, compact)
+    return emit
 
+def discard_output(relative_path, data):
+    pass
 
-def detect_region(lines):
+def output_sink(data_dir, compact=False):
     """
-    Finds all lines that contain 'Fire Activity and Teams Assigned   Totals    '
-    and outputs the line before each occurrence.
-    """
-    target_pattern = re.compile(r'Fire Activity and Teams Assigned\s+Totals')
-    found = []
-    for i, line in enumerate(lines):
-        if target_pattern.search(line) and i > 0:
-            # Walk back to the nearest non-empty line; PDF extraction includes spacer lines.
-            j = i - 1
-            while j >= 0 and not lines[j].strip():
-                j -= 1
-            if j >= 0:
-                found.append(lines[j].strip())
-    return found
-
-def extract_header_and_summary(file_text, data_dir, today):
+    file_sink(data_dir, compact), or discard_output when data_dir is None.
     """
-    Extracts the header (first three lines), the summary (lines after header up to 'Active Incident Resource Summary'),
-    and stores them along with the current date in a JSON file named daily_summary.json in data_dir.
-    """
-    lines = file_text.splitlines()
-    header = lines[:3]
-    # Find the index of the 'Active Incident Resource Summary' line
-    summary_end_idx = None
-    for idx, line in enumerate(lines[3:], start=3):
-        if 'Active Incident Resource Summary' in line:
-            summary_end_idx = idx
+    return discard_output if data_dir is None else file_sink(data_dir, compact)
+
+def stream_daily_summary(report, emit, today):
+    """
+    Header (first three lines) and summary, up to 'Active Incident Resource Summary'.
+    """
+    header, summary_lines = [], []
+    done = False
+    while not done:
+        item = yield
+        if item is None:
             break
-    if summary_end_idx is not None:
-        summary_lines = lines[3:summary_end_idx]
-    else:
-        summary_lines = lines[3:]
-    summary = '\n'.join(summary_lines).strip()
-    header_dict = {
+        start, batch = item
+        for i, line in enumerate(batch, start):
+            if i < 3:
+                header.append(line)
+            elif 'Active Incident Resource Summary' in line:
+                done = True
+                break
+            else:
+                summary_lines.append(line)
+    report['header'] = {
         'header': header,
-        'summary': summary,
+        'summary': '\n'.join(summary_lines).strip(),
         'date': today
     }
-    out_path = os.path.join(data_dir, 'daily_summary.json')
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump(header_dict, f, indent=2)
-    return header_dict
+    emit('daily_summary.json', report['header'])
 
-def main():
-    if len(sys.argv) == 2:
-        file_path = sys.argv[1]
-    else:
-        file_path = default_url
-    today = datetime.utcnow().strftime('%Y%m%d')
-    data_dir = os.path.join('data', today)
-    if os.path.exists(data_dir):
-        shutil.rmtree(data_dir)
-    os.makedirs(data_dir, exist_ok=True)
-    if is_url(file_path):
+def stream_pred_services(report, emit):
+    """
+    Every line after the first 'Predictive Services' line.
+    """
+    summary_lines = None
+    while True:
+        item = yield
+        if item is None:
+            break
+        batch = item[1]
+        if summary_lines is None:
+            for pos, line in enumerate(batch):
+                if 'Predictive Services' in line:
+                    summary_lines = []
+                    batch = batch[pos + 1:]
+                    break
+            else:
+                continue
+        summary_lines.extend('\n\n' if line.strip() == '' else line for line in batch)
+    if summary_lines is None:
+        report['predictive'] = ''
+        return
+    report['predictive'] = ''.join(summary_lines).strip()
+    emit(predictive_filename, report['predictive'])
+
+def stream_summary_table(report, emit, today, report_day, typed):
+    """
+    The GACC table, from 'Active Incident Resource Summary' through its 'Total' line.
+    """
+    table_lines = None
+    done = False
+    while not done:
+        item = yield
+        if item is None:
+            break
+        for line in item[1]:
+            if table_lines is not None:
+                table_lines.append(line.strip())
+                if line.strip().startswith('Total'):
+                    done = True
+                    break
+            elif 'Active Incident Resource Summary' in line:
+                table_lines = []
+    rows = parse_table_rows(table_schemas['gacc_summary'], table_lines or [])
+    emit(f'fire_summary_{today}.json', rows)
+    report['summary'] = rows
+    report['typed_summary'] = type_rows(rows, summary_column_types, report_day)
+    if typed:
+        emit(f'fire_summary_{today}_typed.json', report['typed_summary'])
+
+def advance_table_cursor(cursor, line):
+    """
+    Moves a region table cursor past one line, collecting the table's data lines: from
+    the first 'Incident Name' header through its 'Own' line, then every line up to a
+    blank line, the next area header or a 'Total' line. A repeated 'Incident' header
+    (the table continues on a new page) is skipped through its 'Own' line. Returns True
+    once the table has ended.
+    """
+    state = cursor['state']
+    if state == 'header':
+        if 'Incident Name' not in line:
+            return False
+        # The header line itself may hold 'Own'
+        state = cursor['state'] = 'own'
+    if state in ('own', 'skip'):
+        if 'Own' in line:
+            cursor['state'] = 'data'
+        return False
+    stripped = line.strip()
+    if not stripped or table_end_pattern.match(stripped):
+        return True
+    if stripped.startswith('Incident'):
+        # A repeated header (the table continues on a new page) runs to its 'Own' line
+        if 'Own' not in line:
+            cursor['state'] = 'skip'
+        return False
+    cursor['lines'].append(stripped)
+    return False
+
+def stream_region_tables(report, emit, today, report_day, typed):
+    """
+    Detects regions (the non-empty line before each 'Fire Activity and Teams Assigned
+    Totals' marker) and parses the first table after each one. Regions waiting for the
+    same table share one cursor; Region_<N> files are written as each table ends.
+    """
+    region_key = {}
+    region_tables, typed_regions = [], []
+    cursors = {}
+    open_cursors = []
+
+    def write_region(idx, name, cursor):
+        region_tables[idx - 1] = (name, cursor['rows'])
+        typed_regions[idx - 1] = (name, cursor['typed_rows'])
+        emit(f'regions/Region_{idx}_{today}.json', cursor['rows'])
+        if typed:
+            emit(f'regions/Region_{idx}_{today}_typed.json', cursor['typed_rows'])
+
+    def finish(cursor):
+        cursor['rows'] = parse_table_rows(table_schemas['region'], cursor.pop('lines'))
+        cursor['typed_rows'] = type_rows(cursor['rows'], region_column_types, report_day)
+        for idx, name in cursor['targets']:
+            write_region(idx, name, cursor)
+
+    last_non_empty = None
+    while True:
+        item = yield
+        if item is None:
+            break
+        for line in item[1]:
+            if last_non_empty is not None and region_marker_pattern.search(line):
+                idx = len(region_key) + 1
+                region_key[str(idx)] = last_non_empty
+                region_tables.append(None)
+                typed_regions.append(None)
+                # A repeated region name reuses the table found after its first header
+                cursor = cursors.get(last_non_empty)
+                if cursor is None:
+                    cursor = next((c for c in open_cursors if c['state'] == 'header'), None)
+                    if cursor is None:
+                        cursor = {'state': 'header', 'lines': [], 'targets': [], 'rows': None}
+                        open_cursors.append(cursor)
+                    cursors[last_non_empty] = cursor
+                cursor['targets'].append((idx, last_non_empty))
+                if cursor['rows'] is not None:
+                    write_region(idx, last_non_empty, cursor)
+            if open_cursors:
+                still_open = []
+                for cursor in open_cursors:
+                    if advance_table_cursor(cursor, line):
+                        finish(cursor)
+                    else:
+                        still_open.append(cursor)
+                open_cursors = still_open
+            stripped = line.strip()
+            if stripped:
+                last_non_empty = stripped
+    for cursor in open_cursors:
+        finish(cursor)
+    emit(f'regions/region_key_{today}.json', region_key)
+    report['region_key'] = region_key
+    report['regions'] = region_tables
+    report['typed_regions'] = typed_regions
+
+def stream_region_summaries(report, emit, today):
+    """
+    The narrative lines from each region header to the next 'Incident Name' line.
+    """
+    region_map = {}
+    narrative = None
+    while True:
+        item = yield
+        if item is None:
+            break
+        for line in item[1]:
+            if narrative is not None and 'Incident Name' in line:
+                narrative = None
+            if narrative is not None:
+                narrative.append(line)
+            elif region_header_pattern.search(line):
+                narrative = region_map[line.strip()] = []
+    emit(f'regions/region_summaries_{today}.json', region_map)
+    report['region_summaries'] = region_map
+
+def stream_report(lines, data_dir, today=None, typed=False, compact=False, precompress=False, metrics=None,
+                  previous=None, sink=None):
+    """
+    Parses an iterable of report lines (see iter_report_lines), consuming it once, and
+    writes every per-day output. Memory holds the current page, each stage's
+    open section and the parsed rows, never the whole text. With today=None the
+    outputs are dated from the report header, and None is returned when it has no date.
+    Outputs go to sink (default: file_sink(data_dir, compact), or nowhere when data_dir
+    is None). Returns the parsed report (see parse_report).
+    """
+    lines = iter(lines)
+    head = list(islice(lines, 5))
+    report_day = report_date(head)
+    if today is None:
+        if report_day is None:
+            return None
+        today = report_day
+    if sink is None:
+        sink = output_sink(data_dir, compact)
+    report = {'date': report_day or today}
+    stages = {
+        'header': stream_daily_summary(report, sink, today),
+        'predictive_services': stream_pred_services(report, sink),
+        'summary_table': stream_summary_table(report, sink, today, report['date'], typed),
+        'region_tables': stream_region_tables(report, sink, today, report['date'], typed),
+        'region_summaries': stream_region_summaries(report, sink, today),
+    }
+    for stage in stages.values():
+        next(stage)
+    active = list(stages.items())
+    line_count = 0
+    batches = chain([head], iter(lambda: list(islice(lines, stream_batch_lines)), []))
+    # Lines are pulled (and pages extracted) between sends, so each stage's wall time,
+    # CPU time and peak RSS cover only its own work on the batches
+    for batch in batches:
+        if not batch:
+            continue
+        item = (line_count, batch)
+        line_count += len(batch)
+        finished = False
+        for name, stage in active:
+            if metrics is not None:
+                wall_start, cpu_start = start_stage(metrics)
+            try:
+                stage.send(item)
+            except StopIteration:
+                # The stage's section closed and its output is written
+                finished = True
+                stages[name] = None
+            if metrics is not None:
+                add_stage_time(metrics, name, wall_start, cpu_start)
+        if finished:
+            active = [(name, stage) for name, stage in active if stages[name] is not None]
+    for name, stage in active:
+        if metrics is not None:
+            wall_start, cpu_start = start_stage(metrics)
         try:
-            file_path = download_pdf(file_path, save_dir=data_dir)
-            ext = '.pdf'
-        except Exception as e:
-            sys.exit(1)
-    else:
-        if not os.path.exists(file_path):
-            sys.exit(1)
-        ext = os.path.splitext(file_path)[1].lower()
-    if ext == '.pdf':
-        file_text = extract_text_from_pdf(file_path)
-    else:
-        file_text = load_text_file(file_path)
+            stage.send(None)
+        except StopIteration:
+            pass
+        if metrics is not None:
+            add_stage_time(metrics, name, wall_start, cpu_start)
 
-    # Extract and save header and summary
-    header_data = extract_header_and_summary(file_text, data_dir, today)
+    if previous is not None:
+        with timed_stage(metrics, 'diff'):
+            sink(f'diff_{today}.json', day_diff(report, previous))
+    with timed_stage(metrics, 'bundle'):
+        sink(f'bundle_{today}.json', build_bundle(today, report['header'], report['summary'], report['predictive'],
+                                                  report['region_key'], report['regions'],
+                                                  report['region_summaries']))
+    rows = incident_rows(report)
+    with timed_stage(metrics, 'rollup'):
+        sink(f'rollup_{today}.json', rollups.daily_rollup(report['date'], rows))
+    with timed_stage(metrics, 'rankings'):
+        sink(f'top_{today}.json', rankings.daily_rankings(report['date'], rows))
+    if precompress and data_dir is not None:
+        with timed_stage(metrics, 'precompress'):
+            precompress_outputs(data_dir)
 
-    pred_services_text = parse_pred_services(file_text.splitlines(), data_dir)
+    if metrics is not None:
+        metrics['report_date'] = report['date']
+        metrics['counts'].update({
+            'lines': line_count,
+            'regions': len(report['regions']),
+            'summary_rows': len(report['summary']),
+            'region_rows': sum(len(rows) for _, rows in report['regions']),
+        })
+    return report
 
-    summary_data = parse_summary_table(file_text, data_dir, today)
-    # visualize_summary_data(summary_data, f'data/{today}', header_data)
+# The per-section parse functions: each runs one stream stage over a whole list of
+# lines and, given a data_dir, writes that stage's outputs there.
+def run_stage(stage, lines):
+    """
+    Feeds every line to a stream stage and finishes it; the stage leaves its result
+    in the report dict it was created with.
+    """
+    next(stage)
+    for item in ((0, lines), None):
+        try:
+            stage.send(item)
+        except StopIteration:
+            break
 
-    regions = detect_region(file_text.splitlines())
-    regions_dir = os.path.join(data_dir, 'regions')
-    os.makedirs(regions_dir, exist_ok=True)
-    region_key = {}
-    for idx, r in enumerate(regions, 1):
-         region_data = parse_region_table(file_text.splitlines(), r)
-        
-         # Save each region's data as a JSON file in data/TODAY/regions
-         # visualize_region_data(idx, r, region_data, regions_dir, header_data)
-         out_filename = os.path.join(regions_dir, f'Region_{idx}_{today}.json')
-         with open(out_filename, 'w') as f:
-             json.dump(region_data, f, indent=2)
-         region_key[str(idx)] = r
-    # Save the region key as a JSON file
-    key_filename = os.path.join(regions_dir, f'region_key_{today}.json')
-    with open(key_filename, 'w') as f:
-        json.dump(region_key, f, indent=2)
-
-    region_map = parse_region_summary(file_text.splitlines(), data_dir, today)
+def extract_header_and_summary(file_text, data_dir, today, compact=False):
+    """
+    Extracts the header (first three lines), the summary (lines after header up to 'Active Incident Resource Summary'),
+    and stores them along with the current date in a JSON file named daily_summary.json in data_dir
+    (unless data_dir is None).
+    """
+    report = {}
+    run_stage(stream_daily_summary(report, output_sink(data_dir, compact), today), file_text.splitlines())
+    return report['header']
+
+#Predictive Services Discussion:
+def parse_pred_services(lines, data_dir):
+    """
+    Joins all lines after the line containing 'Predictive Services' into a single string,
+    saves it to predictive_summary.txt in the data_dir (unless data_dir is None), and
+    returns the string.
+    """
+    report = {}
+    run_stage(stream_pred_services(report, output_sink(data_dir)), lines)
+    return report['predictive']
+
+def parse_summary_table(file_text, data_dir, today, compact=False):
+    """
+    Parses the GACC table after 'Active Incident Resource Summary' up to and including
+    its 'Total' line, saved as fire_summary_<today>.json unless data_dir is None.
+    """
+    report = {}
+    run_stage(stream_summary_table(report, output_sink(data_dir, compact), today, today, False),
+              file_text.splitlines())
+    return report['summary']
+
+def parse_region_summary(lines, data_dir, today, compact=False):
+    """
+    For each region header, captures the lines between the header and the first line containing 'Incident' after it.
+    Returns a dict: {region_header: [lines_between_header_and_incident]}, also saved
+    under data_dir/regions unless data_dir is None.
+    """
+    report = {}
+    run_stage(stream_region_summaries(report, output_sink(data_dir, compact), today), lines)
+    return report['region_summaries']
+
+@lru_cache(maxsize=1)
+def region_tables_of(lines):
+    report = {}
+    report_day = report_date(lines) or datetime.utcnow().strftime('%Y%m%d')
+    run_stage(stream_region_tables(report, discard_output, report_day, report_day, False), lines)
+    return tuple((name, tuple(rows)) for name, rows in report['regions'])
+
+def region_tables(lines):
+    """
+    [(region name, rows)] for every detected region, in document order. The tables of
+    the most recent lines are kept, so the region-by-region calls below (detect_region,
+    then parse_region_table per region) parse the report once, not once per region.
+    """
+    return [(name, [dict(row) for row in rows]) for name, rows in region_tables_of(tuple(lines))]
+
+def detect_region(lines, tables=None):
+    """
+    Finds all lines that contain 'Fire Activity and Teams Assigned   Totals    '
+    and outputs the nearest non-empty line before each occurrence. tables is
+    region_tables(lines), built when not given.
+    """
+    return [name for name, rows in (region_tables_of(tuple(lines)) if tables is None else tables)]
+
+def parse_region_table(lines, region_name, tables=None):
+    """
+    Parses the first table after the given region header in the provided lines,
+    using the 'region' table schema. tables is region_tables(lines), built when not given.
+    """
+    for name, rows in (region_tables_of(tuple(lines)) if tables is None else tables):
+        if name == region_name:
+            return [dict(row) for row in rows]
+    # Not a detected region; fall back to the table after the first line mentioning it
+    start = next((i for i, line in enumerate(lines) if region_name in line), None)
+    if start is None:
+        return []
+    cursor = {'state': 'header', 'lines': []}
+    for line in islice(lines, start + 1, None):
+        if advance_table_cursor(cursor, line):
+            break
+    return parse_table_rows(table_schemas['region'], cursor['lines'])
+
+def report_text_from(source):
+    """
+    The report text of source: a str is taken as report text, bytes starting with
+    '%PDF' are extracted as a PDF (serially, in memory) and other bytes as UTF-8 text.
+    """
+    if isinstance(source, str):
+        return source
+    if source[:5] == b'%PDF-':
+        import io
+        pdf_reader = load_pypdf2().PdfReader(io.BytesIO(source))
+        return join_pages(page.extract_text() for page in pdf_reader.pages)
+    return source.decode('utf-8')
+
+def parse_report(source, today=None, typed=False, sink=None):
+    """
+    Library entry point: parses a report (text, or the bytes of a PDF or text file; see
+    report_text_from) and returns it without touching the disk. Outputs are dated today
+    (default: the report header's date, else the current UTC date). Pass
+    sink=file_sink(data_dir) to also write the usual per-day files.
+
+    Returns a dict:
+      'date'             report date (YYYYMMDD)
+      'header'           {'header', 'summary', 'date'} as in daily_summary.json
+      'predictive'       the Predictive Services discussion
+      'summary'          GACC summary rows, 'typed_summary' the same with typed columns
+      'region_key'       {N: region name}
+      'regions'          [(region name, rows)], 'typed_regions' the same with typed columns
+      'region_summaries' {region header: [narrative lines]}
+    """
+    lines = report_text_from(source).splitlines()
+    if today is None:
+        today = report_date(lines[:5]) or datetime.utcnow().strftime('%Y%m%d')
+    return stream_report(lines, None, today, typed=typed, sink=sink)
+
+def write_charts(report, out_dir, published_dir=None, workers=1):
+    """
+    Renders the report's PNG charts into out_dir, reusing unchanged ones from
+    published_dir (see charts.render_charts). Charts are skipped, with a note, when
+    matplotlib or numpy is not installed. Returns the render counts, or None if skipped.
+    """
+    import charts
+    try:
+        return charts.render_charts(report, out_dir, published_dir, workers)
+    except ImportError as e:
+        print(f'Skipping charts: {e}')
+        return None
+
+def record_history(report, output_root, history_path, day=None):
+    """
+    Updates the cross-day stores with the report: appends its rows and adds its
+    discussions to the text index in the history database, links its incidents to
+    earlier days in <output_root>/incidents, and folds them into the season rollup and
+    leaderboards in <output_root>/rollups and /rankings. day is the output folder the
+    report was published in (default: its date).
+    """
+    import history_store
+    import text_index
+    rows = incident_rows(report)
+    conn = history_store.open_history(history_path)
+    try:
+        history_store.append_day(conn, report['date'], rows, report['typed_summary'])
+        text_index.update_text_index(conn, report['date'], day or report['date'],
+                                     text_index.report_documents(report))
+    finally:
+        conn.close()
+    matched = incident_index.update_incident_index(os.path.join(output_root, 'incidents'), report['date'], rows)
+    rollups.update_season_rollup(os.path.join(output_root, 'rollups'), report['date'], matched)
+    rankings.update_season_rankings(os.path.join(output_root, 'rankings'), report['date'], matched)
+
+def backfill_report(file_path, output_root, cache_dir, options, charts=False):
+    """
+    Backfill worker: streams one report into a staging directory in output_root,
+    dating the outputs from its header, and with charts renders its charts there too.
+    Returns (file_path, report date, staging directory, report), or
+    (file_path, None, None, None) when the header has no date. options are passed
+    through to stream_report.
+    """
+    staging_dir = staging_dir_for(os.path.join(output_root, os.path.basename(file_path)))
+    try:
+        report = stream_report(iter_report_lines(file_path, workers=1, cache_dir=cache_dir), staging_dir, **options)
+        if report is not None and charts:
+            write_charts(report, staging_dir, os.path.join(output_root, report['date']))
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    if report is None:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return file_path, None, None, None
+    return file_path, report['date'], staging_dir, report
+
+def backfill_keep(data_dir, report_day, file_path, charts=False):
+    """
+    Files of an existing day folder that a backfill does not produce, so publishing
+    must keep them: the day's downloaded PDF and its download validators, the live
+    run's metrics, the backfilled report itself and, unless charts are redrawn, the
+    published charts.
+    """
+    keep = [os.path.join(data_dir, name)
+            for name in (f'fire_summary_{report_day}.pdf', 'download_validators.json', metrics_filename)]
+    keep.append(file_path)
+    if not charts:
+        import charts as chart_module
+        for root, dirs, files in os.walk(data_dir):
+            keep.extend(os.path.join(root, name) for name in files
+                        if name.endswith('.png') or name.startswith(chart_module.hashes_filename))
+    return keep
+
+def report_inputs(directory):
+    """
+    The PDF and text reports in directory, leaving out the pipeline's own text output
+    (a published day folder holds both).
+    """
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in ('.pdf', '.txt') and name != predictive_filename
+    )
+
+def backfill(paths, output_root='data', workers=0, cache_dir=None, history_path=None, charts=False, **options):
+    """
+    Rebuilds the dated output folders for many archived reports in a process pool.
+    Directories in paths are expanded to the reports in them (see report_inputs). Each
+    report is dated from its own header; when several reports share a date the last
+    one in path order wins. Workers stream each report into its own staging directory;
+    this process publishes them in date order, writing each day's diff against the day
+    before it (see load_previous_report) and, with a history_path, appending them to the
+    history store. Files of an existing day that a backfill does not produce, such
+    as the day's downloaded PDF, are kept (see backfill_keep). With charts
+    each worker also renders its report's charts. Other keyword options (typed, compact,
+    precompress) are passed to stream_report. Returns {report date: data_dir}.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(report_inputs(path))
+        else:
+            files.append(path)
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    from concurrent.futures import ProcessPoolExecutor
+    by_date = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for file_path, report_day, staging_dir, report in pool.map(
+                    backfill_report, files, [output_root] * len(files), [cache_dir] * len(files),
+                    [options] * len(files), [charts] * len(files)):
+                if report_day is None:
+                    print(f'Skipping {file_path}: no report date in the header')
+                    continue
+                if report_day in by_date:
+                    print(f'{file_path} replaces {by_date[report_day][0]} for {report_day}')
+                    shutil.rmtree(by_date[report_day][1], ignore_errors=True)
+                by_date[report_day] = (file_path, staging_dir, report)
+
+        written = {}
+        for report_day in sorted(by_date):
+            file_path, staging_dir, report = by_date[report_day]
+            data_dir = os.path.join(output_root, report_day)
+            # Days are published in date order, so the previous day is already on disk
+            previous = load_previous_report(output_root, report_day)
+            if previous is not None:
+                diff_path = write_day_diff(staging_dir, report_day, report, previous, options.get('compact', False))
+                if options.get('precompress'):
+                    precompress_file(diff_path)
+            publish_outputs(staging_dir, data_dir, backfill_keep(data_dir, report_day, file_path, charts))
+            if history_path:
+                record_history(report, output_root, history_path)
+            written[report_day] = data_dir
+        return written
+    finally:
+        for _, staging_dir, _ in by_date.values():
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Parse the NIFC Incident Management Situation Report.')
+    parser.add_argument('file_path', nargs='?', default=default_url,
+                        help='URL, PDF or text file of the report (default: the NIFC sitrep URL)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='processes used for PDF page extraction; 0 uses every CPU, 1 extracts serially')
+    parser.add_argument('--cache-dir', default=default_cache_dir,
+                        help='directory for cached PDF text, keyed by content hash')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always extract the PDF text, ignoring the cache')
+    parser.add_argument('--output-root', default='data',
+                        help='directory that receives the dated output folders')
+    parser.add_argument('--typed', action='store_true',
+                        help='also write *_typed.json tables with numeric columns as numbers and unknowns as null')
+    parser.add_argument('--compact', action='store_true',
+                        help='write minified JSON (no indentation)')
+    parser.add_argument('--precompress', action='store_true',
+                        help='write .gz (and .br when brotli is installed) next to each JSON/text output')
+    parser.add_argument('--charts', action='store_true',
+                        help='also render PNG charts of the summary and each region (needs matplotlib and numpy)')
+    parser.add_argument('--history', default=None,
+                        help='SQLite history store the day is appended to (default: <output-root>/history.sqlite)')
+    parser.add_argument('--no-history', action='store_true',
+                        help='do not update the history store or the cross-day incident index')
+    parser.add_argument('--backfill', nargs='+', metavar='PATH',
+                        help='rebuild history from archived reports (PDF/text files or directories), '
+                             'dating each from its header')
+    parser.add_argument('--daemon', action='store_true',
+                        help='keep running, polling the report on a schedule and ingesting it only when it changes')
+    parser.add_argument('--interval', type=float, default=900,
+                        help='daemon: seconds between polls (default: 900)')
+    parser.add_argument('--jitter', type=float, default=0.1,
+                        help='daemon: randomize each wait by up to this fraction of it (default: 0.1)')
+    parser.add_argument('--retry', type=float, default=60,
+                        help='daemon: seconds before the first retry after a failed poll; doubles per failure')
+    parser.add_argument('--max-backoff', type=float, default=3600,
+                        help='daemon: longest wait between retries (default: 3600)')
+    parser.add_argument('--status-file', default=None,
+                        help='daemon: health/status JSON rewritten every poll (default: <output-root>/daemon_status.json)')
+    return parser.parse_args(argv)
+
+def run_ingest(args, session=None, last_digest=None):
+    """
+    Fetches (or opens) the report and, unless it is unchanged, parses it into today's
+    folder, updates the history stores and writes the run metrics. Returns
+    {'status': 'not_modified' | 'unchanged' | 'updated', 'digest', 'report_date'}.
+    'unchanged' means the fetched content matches last_digest and today's folder
+    already exists. Download and file errors propagate to the caller.
+    """
+    cache_dir = None if args.no_cache else args.cache_dir
+    history_path = None if args.no_history else (args.history or os.path.join(args.output_root, 'history.sqlite'))
+    output_options = {'typed': args.typed, 'compact': args.compact, 'precompress': args.precompress}
+    file_path = args.file_path
+    today = datetime.utcnow().strftime('%Y%m%d')
+    data_dir = os.path.join(args.output_root, today)
+    metrics = new_metrics(file_path)
+    validators_path = None
+    # Everything is written to a staging directory and published once complete
+    staging_dir = staging_dir_for(data_dir)
+    try:
+        keep = [os.path.join(data_dir, metrics_filename)]
+        if is_url(file_path):
+            # The day's PDF and its download validators stay in data_dir between runs
+            save_dir = data_dir if os.path.isdir(data_dir) else staging_dir
+            with timed_stage(metrics, 'download'):
+                file_path = download_pdf(file_path, save_dir=save_dir, session=session)
+            if file_path is None:
+                return {'status': 'not_modified', 'digest': last_digest, 'report_date': None}
+            # Published with the day when it was saved to the staging directory
+            validators_path = os.path.join(data_dir, 'download_validators.json')
+            keep += [file_path, validators_path]
+        else:
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(file_path)
+            keep.append(file_path)
+        digest = file_digest(file_path)
+        if digest == last_digest and os.path.isdir(data_dir):
+            return {'status': 'unchanged', 'digest': digest, 'report_date': None}
+        try:
+            metrics['counts']['input_bytes'] = os.path.getsize(file_path)
+            # Pages stream from extraction through the parse stages; see stream_report
+            lines = iter_report_lines(file_path, workers=args.workers, cache_dir=cache_dir, metrics=metrics)
+            previous = load_previous_report(args.output_root, today)
+            report = stream_report(lines, staging_dir, today, metrics=metrics, previous=previous, **output_options)
+            if args.charts:
+                with timed_stage(metrics, 'charts'):
+                    rendered = write_charts(report, staging_dir, data_dir, args.workers)
+                if rendered is not None:
+                    metrics['counts'].update({'charts_rendered': rendered['rendered'],
+                                              'charts_reused': rendered['reused']})
+            with timed_stage(metrics, 'publish'):
+                publish_outputs(staging_dir, data_dir, keep)
+            if history_path:
+                with timed_stage(metrics, 'history'):
+                    record_history(report, args.output_root, history_path, today)
+            write_metrics(metrics, data_dir, args.output_root)
+        except BaseException:
+            # Forget the validators so the next run downloads and ingests the report again,
+            # including a day already published whose history step failed
+            if validators_path and os.path.exists(validators_path):
+                os.remove(validators_path)
+            raise
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return {'status': 'updated', 'digest': digest, 'report_date': report['date']}
+
+def next_poll_delay(args, failures):
+    """
+    Seconds until the next poll: the interval after a success, otherwise the retry
+    delay doubled per consecutive failure up to max_backoff. Either way the wait is
+    randomized by up to +/- jitter so restarted daemons do not poll in lockstep.
+    """
+    if failures:
+        delay = min(args.max_backoff, args.retry * 2 ** (failures - 1))
+    else:
+        delay = args.interval
+    return max(1.0, delay * (1 + random.uniform(-args.jitter, args.jitter)))
+
+def run_daemon(args):
+    """
+    Polls the report until SIGTERM/SIGINT, reusing one HTTP session, the imported
+    modules and the in-process caches across polls. Each poll costs a conditional GET
+    (and a digest when the server ignores the validators); the pipeline only runs
+    when the content changes. The status file records the daemon's state, the last
+    poll's outcome and the next poll time for health checks.
+    """
+    status_path = args.status_file or os.path.join(args.output_root, 'daemon_status.json')
+    os.makedirs(os.path.dirname(os.path.abspath(status_path)), exist_ok=True)
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    status = {
+        'pid': os.getpid(),
+        'source': args.file_path,
+        'started': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'state': 'starting',
+        'polls': 0,
+        'updates': 0,
+        'consecutive_failures': 0,
+        'last_poll': None,
+        'last_result': None,
+        'last_update': None,
+        'last_report_date': None,
+        'last_error': None,
+        'next_poll': None,
+    }
+    import requests
+    last_digest = None
+    session = requests.Session()
+    try:
+        while not stop.is_set():
+            status['state'] = 'polling'
+            status['last_poll'] = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+            write_json(status_path, status)
+            try:
+                outcome = run_ingest(args, session=session, last_digest=last_digest)
+            except Exception as e:
+                if isinstance(e, requests.RequestException):
+                    print(f'Poll failed: {e}', file=sys.stderr)
+                else:
+                    import traceback
+                    traceback.print_exc()
+                status['consecutive_failures'] += 1
+                status['last_result'] = 'error'
+                status['last_error'] = f'{type(e).__name__}: {e}'
+            else:
+                last_digest = outcome['digest']
+                status['consecutive_failures'] = 0
+                status['last_result'] = outcome['status']
+                if outcome['status'] == 'updated':
+                    status['updates'] += 1
+                    status['last_update'] = status['last_poll']
+                    status['last_report_date'] = outcome['report_date']
+            status['polls'] += 1
+            delay = next_poll_delay(args, status['consecutive_failures'])
+            status['state'] = 'backoff' if status['consecutive_failures'] else 'idle'
+            status['next_poll'] = datetime.utcfromtimestamp(time.time() + delay).strftime('%Y-%m-%dT%H:%M:%SZ')
+            write_json(status_path, status)
+            print(f"{status['last_poll']} {status['last_result']}; next poll in {delay:.0f}s")
+            stop.wait(delay)
+    finally:
+        session.close()
+        status['state'] = 'stopped'
+        status['next_poll'] = None
+        write_json(status_path, status)
+
+def main():
+    args = parse_args()
+    if args.backfill:
+        cache_dir = None if args.no_cache else args.cache_dir
+        history_path = None if args.no_history else (args.history or os.path.join(args.output_root, 'history.sqlite'))
+        written = backfill(args.backfill, output_root=args.output_root, workers=args.workers, cache_dir=cache_dir,
+                           history_path=history_path, typed=args.typed, compact=args.compact,
+                           charts=args.charts, precompress=args.precompress)
+        for report_day, out_dir in written.items():
+            print(f'{report_day}: {out_dir}')
+        return
+    if args.daemon:
+        run_daemon(args)
+        return
+    try:
+        outcome = run_ingest(args)
+    except OSError as e:
+        # Includes requests.RequestException, an IOError subclass
+        print(f'Ingest failed: {e}', file=sys.stderr)
+        sys.exit(1)
+    if outcome['status'] == 'not_modified':
+        print('Report not modified since the last download; skipping parse.')
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,212 @@
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import warnings
+
+# PNG charts of a day's report for link previews and the no-JS fallback: the national
+# GACC summary (fire_summary_analysis.png) and one chart per region
+# (regions/fire_analysis_region_<N>.png), drawn as in reference_material/visualize.py.
+#
+# Each chart is described by a small JSON-able spec built from the typed tables in one
+# pass (one row of values per bar group); the worker turns it into a NumPy matrix and
+# draws it. chart_hashes.json records each spec's hash, so a rerun over the same day
+# copies the published PNG of every unchanged chart instead of drawing it again. The
+# remaining charts are drawn in a process pool.
+#
+# matplotlib and numpy are optional and imported only by the rendering workers.
+
+# Bump when the drawing code changes, so every chart is redrawn once
+chart_version = 1
+hashes_filename = 'chart_hashes.json'
+
+# D3 color scheme constants to match web components
+D3_COLORS = {
+    'charcoal': '#36454F',      # Total acres, personnel, crews
+    'pastel_green': '#4e8a4e',  # Containment, positive changes
+    'dark_red': '#8b2513',      # Negative changes
+    'dark_grey': '#696969',     # Crews
+    'medium_grey': '#A9A9A9',   # Engines
+    'light_grey': '#D3D3D3'     # Helicopters
+}
+
+# Typed columns plotted, in matrix column order
+summary_columns = [
+    'Cumulative Acres', 'Incidents', 'Total Personnel', 'Change in Personnel', 'Crews', 'Engines', 'Helicopters',
+]
+region_columns = ['Total Acres', '%', 'Total PPL', 'Chge in PPL', 'Crw', 'Eng', 'Heli']
+
+def available():
+    return all(importlib.util.find_spec(name) is not None for name in ('matplotlib', 'numpy'))
+
+def table_values(rows, columns):
+    """
+    One row of numbers per table row, unknowns (None) as 0.
+    """
+    return [[row.get(column) or 0 for column in columns] for row in rows]
+
+def chart_specs(report):
+    """
+    [(relative path, spec)] for the national chart and every region chart of a parsed
+    report (see Fire_Sample.stream_report).
+    """
+    header = report['header'].get('header', [])
+    subtitle = header[1] if len(header) > 1 else report['date']
+    summary = [row for row in report['typed_summary'] if row.get('GACC') != 'Total']
+    specs = [('fire_summary_analysis.png', {
+        'kind': 'summary',
+        'title': f'National Fire Summary Analysis\n{subtitle}',
+        'labels': [row['GACC'] for row in summary],
+        'values': table_values(summary, summary_columns),
+    })]
+    for idx, (region, rows) in enumerate(report['typed_regions'], 1):
+        raw_rows = report['regions'][idx - 1][1]
+        specs.append((f'regions/fire_analysis_region_{idx}.png', {
+            'kind': 'region',
+            'title': f'Fire Incident Analysis\nRegion {region}\n{subtitle}',
+            'labels': [row.get('Incident Name') or '' for row in rows],
+            'values': table_values(rows, region_columns),
+            'cost': [(row.get('$$ CTD') or '0').replace('$', '') for row in raw_rows],
+        }))
+    return specs
+
+def spec_hash(spec):
+    data = json.dumps([chart_version, spec], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def new_figure(plt, title):
+    fig, axes = plt.subplots(2, 2, figsize=(11, 7.5))
+    fig.suptitle(title, fontsize=12)
+    # Set background color to match web interface
+    fig.patch.set_facecolor('#f5f5f5')
+    for ax in axes.flat:
+        ax.set_facecolor('#f5f5f5')
+    return fig, axes.flat
+
+def label_axis(ax, title, xlabel, ylabel, x, labels):
+    ax.set_title(title, fontsize=10)
+    ax.set_xlabel(xlabel, fontsize=9)
+    ax.set_ylabel(ylabel, fontsize=9)
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+    ax.legend(fontsize=8)
+    ax.tick_params(axis='both', which='major', labelsize=8)
+
+def draw_personnel(ax, np, x, personnel, change, names, thing):
+    width = 0.35
+    ax.bar(x - width / 2, personnel, width, label='Total Personnel', color=D3_COLORS['charcoal'], alpha=0.7)
+    change_colors = np.where(change < 0, D3_COLORS['dark_red'], D3_COLORS['pastel_green'])
+    ax.bar(x + width / 2, change, width, label='Change in Personnel', color=change_colors, alpha=0.7)
+    labels = [f'{name}: {p:.0f} ({c:+.0f})' if c != 0 else f'{name}: {p:.0f}'
+              for name, p, c in zip(names, personnel, change)]
+    label_axis(ax, f'Personnel by {thing}', thing, 'Personnel', x, labels)
+
+def draw_resources(ax, x, crews, engines, helicopters, names, thing):
+    width = 0.25
+    ax.bar(x - width, crews, width, label='Crews', color=D3_COLORS['dark_grey'], alpha=0.7)
+    ax.bar(x, engines, width, label='Engines', color=D3_COLORS['medium_grey'], alpha=0.7)
+    ax.bar(x + width, helicopters, width, label='Helicopters', color=D3_COLORS['light_grey'], alpha=0.7)
+    label_axis(ax, f'Resources by {thing}', thing, 'Count', x, names)
+
+def draw_details(ax, text, fontsize):
+    ax.axis('off')
+    ax.text(0.05, 0.95, text, transform=ax.transAxes, fontsize=fontsize, verticalalignment='top',
+            fontfamily='monospace', bbox=dict(boxstyle='round,pad=0.3', facecolor='lightgray', alpha=0.8))
+
+def render_chart(spec, path):
+    """
+    Draws one chart spec (see chart_specs) to a PNG at path. Runs in a worker process.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    names = spec['labels']
+    columns = summary_columns if spec['kind'] == 'summary' else region_columns
+    values = np.array(spec['values'], dtype=float).reshape(len(names), len(columns))
+    x = np.arange(len(names))
+    fig, (ax1, ax2, ax3, ax4) = new_figure(plt, spec['title'])
+    width = 0.35
+    if spec['kind'] == 'summary':
+        acres, incidents, personnel, change, crews, engines, helicopters = values.T
+        ax1.bar(x - width / 2, acres, width, label='Cumulative Acres', color=D3_COLORS['charcoal'], alpha=0.7)
+        ax1.bar(x + width / 2, incidents, width, label='Incidents', color=D3_COLORS['pastel_green'], alpha=0.7)
+        label_axis(ax1, 'Cumulative Acres and Incidents by GACC', 'GACC', 'Acres / Incidents', x,
+                   [f'{name}: {a:,.0f} ({i:.0f} fires)' for name, a, i in zip(names, acres, incidents)])
+        draw_personnel(ax2, np, x, personnel, change, names, 'GACC')
+        draw_resources(ax3, x, crews, engines, helicopters, names, 'GACC')
+        lines = ['Details:', '', 'GACC      Inc  Acres    Crw  Eng  Hel  PPL  Chg', '-' * 50]
+        for i, name in enumerate(names):
+            lines.append(f'{name[:8]:<8} {incidents[i]:>3.0f} {acres[i]:>8,.0f} {crews[i]:>4.0f} {engines[i]:>4.0f} '
+                         f'{helicopters[i]:>4.0f} {personnel[i]:>4.0f} {change[i]:>4.0f}')
+        draw_details(ax4, '\n'.join(lines), 8)
+    else:
+        acres, contained, personnel, change, crews, engines, helicopters = values.T
+        ax1.bar(x - width / 2, acres, width, label='Total Acres', color=D3_COLORS['charcoal'], alpha=0.7)
+        # Containment percentage bar (scaled by corresponding acreage)
+        ax1.bar(x + width / 2, contained / 100 * acres, width, label='Containment % (scaled)',
+                color=D3_COLORS['pastel_green'], alpha=0.7)
+        label_axis(ax1, 'Total Acres and Containment by Incident', 'Incident', 'Acres / Scaled Percentage', x,
+                   [f'{name}: {a:,.0f} ({c:.0f}%)' for name, a, c in zip(names, acres, contained)])
+        draw_personnel(ax2, np, x, personnel, change, names, 'Incident')
+        draw_resources(ax3, x, crews, engines, helicopters, names, 'Incident')
+        lines = ['Details:', '', 'Incident      Crw  Eng  Hel  Cont  PPL  Cost', '-' * 80]
+        for i, name in enumerate(names):
+            lines.append(f'{name[:12]:<12} {crews[i]:>4.0f} {engines[i]:>4.0f} {helicopters[i]:>4.0f} '
+                         f'{contained[i]:>4.0f}% {personnel[i]:>4.0f} {spec["cost"][i]:>8}')
+        draw_details(ax4, '\n'.join(lines), 10)
+    with warnings.catch_warnings():
+        # Dense regions cannot fit every tick label; bbox_inches='tight' still keeps them in the image
+        warnings.simplefilter('ignore', UserWarning)
+        fig.tight_layout()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fig.savefig(path, dpi=75, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+def load_hashes(day_dir):
+    try:
+        with open(os.path.join(day_dir, hashes_filename), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def render_charts(report, out_dir, published_dir=None, workers=1):
+    """
+    Writes the report's charts under out_dir, with chart_hashes.json. A chart whose
+    hash matches the one recorded in published_dir (the day's current folder) is copied
+    from there; the rest are drawn, in a pool of workers processes when workers > 1
+    (0 means one per CPU). Returns {'rendered': n, 'reused': n}.
+    """
+    specs = chart_specs(report)
+    previous = load_hashes(published_dir) if published_dir else {}
+    hashes = {}
+    pending = []
+    reused = 0
+    for name, spec in specs:
+        hashes[name] = spec_hash(spec)
+        target = os.path.join(out_dir, name)
+        source = os.path.join(published_dir, name) if published_dir else None
+        if previous.get(name) == hashes[name] and os.path.isfile(source):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            reused += 1
+        else:
+            pending.append((spec, target))
+    if pending and not available():
+        raise ImportError('matplotlib and numpy are required to render charts.')
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(pending))
+    if workers <= 1:
+        for spec, target in pending:
+            render_chart(spec, target)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_chart, *zip(*pending)))
+    with open(os.path.join(out_dir, hashes_filename), 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, indent=2)
+    return {'rendered': len(pending), 'reused': reused}
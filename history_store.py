@@ -0,0 +1,145 @@
+import argparse
+import csv
+import os
+import sqlite3
+
+# Append-only history of every daily report, one row per incident per day and one row
+# per GACC per day. Each table keeps the typed report columns (see Fire_Sample.type_rows)
+# under SQL-friendly names so season-long queries can select just the columns they need.
+
+incident_columns = [
+    ('report_date', 'Date', 'TEXT NOT NULL'),
+    ('gacc', 'GACC', 'TEXT'),
+    ('region', 'Region', 'TEXT'),
+    ('incident_name', 'Incident Name', 'TEXT'),
+    ('unit', 'Unit', 'TEXT'),
+    ('total_acres', 'Total Acres', 'INTEGER'),
+    ('chge_in_acres', 'Chge in Acres', 'INTEGER'),
+    ('pct_contained', '%', 'INTEGER'),
+    ('ctn_comp', 'Ctn/Comp', 'TEXT'),
+    ('est', 'Est', 'TEXT'),
+    ('total_ppl', 'Total PPL', 'INTEGER'),
+    ('chge_in_ppl', 'Chge in PPL', 'INTEGER'),
+    ('crw', 'Crw', 'INTEGER'),
+    ('eng', 'Eng', 'INTEGER'),
+    ('heli', 'Heli', 'INTEGER'),
+    ('strc_lost', 'Strc Lost', 'INTEGER'),
+    ('ctd_dollars', '$$ CTD', 'INTEGER'),
+    ('origin_own', 'Origin Own', 'TEXT'),
+]
+
+gacc_columns = [
+    ('report_date', None, 'TEXT NOT NULL'),
+    ('gacc', 'GACC', 'TEXT'),
+    ('incidents', 'Incidents', 'INTEGER'),
+    ('cumulative_acres', 'Cumulative Acres', 'INTEGER'),
+    ('crews', 'Crews', 'INTEGER'),
+    ('engines', 'Engines', 'INTEGER'),
+    ('helicopters', 'Helicopters', 'INTEGER'),
+    ('total_personnel', 'Total Personnel', 'INTEGER'),
+    ('change_in_personnel', 'Change in Personnel', 'INTEGER'),
+]
+
+tables = {
+    'incidents': incident_columns,
+    'gacc_summary': gacc_columns,
+}
+
+indexes = [
+    'CREATE INDEX IF NOT EXISTS incidents_date ON incidents (report_date)',
+    'CREATE INDEX IF NOT EXISTS incidents_gacc_date ON incidents (gacc, report_date)',
+    'CREATE INDEX IF NOT EXISTS incidents_incident ON incidents (incident_name, unit, report_date)',
+    'CREATE INDEX IF NOT EXISTS gacc_summary_date ON gacc_summary (report_date)',
+    'CREATE INDEX IF NOT EXISTS gacc_summary_gacc_date ON gacc_summary (gacc, report_date)',
+]
+
+def open_history(path):
+    """
+    Opens (creating if needed) the history database at path.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    for table, columns in tables.items():
+        column_sql = ', '.join(f'{name} {sql_type}' for name, _, sql_type in columns)
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({column_sql})')
+    for statement in indexes:
+        conn.execute(statement)
+    conn.commit()
+    return conn
+
+def append_day(conn, report_date, incident_rows, gacc_rows):
+    """
+    Appends one report's rows. Rows already stored for report_date are replaced,
+    so rerunning a day does not duplicate it.
+    """
+    with conn:
+        for table, rows in (('incidents', incident_rows), ('gacc_summary', gacc_rows)):
+            columns = tables[table]
+            conn.execute(f'DELETE FROM {table} WHERE report_date = ?', (report_date,))
+            placeholders = ', '.join('?' for _ in columns)
+            conn.executemany(
+                f'INSERT INTO {table} VALUES ({placeholders})',
+                [tuple(report_date if key is None else row.get(key) for _, key, _ in columns) for row in rows],
+            )
+
+def load_columns(conn, table, columns, start=None, end=None, gacc=None):
+    """
+    Returns {column: [values...]} for just the requested columns, ordered by date.
+    start and end are inclusive 'YYYYMMDD' bounds; gacc filters to one GACC code.
+    """
+    known = {name for name, _, _ in tables[table]}
+    unknown = [column for column in columns if column not in known]
+    if unknown:
+        raise ValueError(f'Unknown {table} columns: {unknown}')
+    clauses, params = [], []
+    if start:
+        clauses.append('report_date >= ?')
+        params.append(start)
+    if end:
+        clauses.append('report_date <= ?')
+        params.append(end)
+    if gacc:
+        clauses.append('gacc = ?')
+        params.append(gacc)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+    cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY report_date", params)
+    values = list(zip(*cursor.fetchall()))
+    return {column: list(values[i]) if values else [] for i, column in enumerate(columns)}
+
+def export_csv(conn, table, out_path):
+    """
+    Streams a whole table to a CSV file and returns the number of rows written.
+    """
+    names = [name for name, _, _ in tables[table]]
+    cursor = conn.execute(f"SELECT {', '.join(names)} FROM {table} ORDER BY report_date")
+    count = 0
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        while True:
+            batch = cursor.fetchmany(10000)
+            if not batch:
+                break
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the daily report history store.')
+    parser.add_argument('history', nargs='?', default=os.path.join('data', 'history.sqlite'),
+                        help='history database (default: data/history.sqlite)')
+    parser.add_argument('--export', metavar='DIR', required=True,
+                        help='directory that receives incidents.csv and gacc_summary.csv')
+    args = parser.parse_args()
+    conn = open_history(args.history)
+    os.makedirs(args.export, exist_ok=True)
+    for table in tables:
+        out_path = os.path.join(args.export, f'{table}.csv')
+        print(f'{out_path}: {export_csv(conn, table, out_path)} rows')
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from incident_index import name_key
+
+# Day-over-day changes between two reports' typed incident rows (see Fire_Sample.incident_rows).
+#
+# Rows are joined on Unit + normalized incident name: the previous day's rows go into a
+# dict once and each of today's rows is a single lookup, so the diff is O(n) per day.
+# A key that appears more than once in a report (the same name under one unit) pairs
+# its occurrences in document order. Renamed fires show up as one removed and one new
+# incident; the cross-day incident index links those.
+
+# Columns compared for 'changed'; the daily change columns (Chge in Acres/PPL) move every
+# day by definition and are left out.
+diff_columns = [
+    'Total Acres', '%', 'Ctn/Comp', 'Est', 'Total PPL', 'Crw', 'Eng', 'Heli', 'Strc Lost', '$$ CTD',
+]
+
+identity_columns = ['Incident Name', 'Unit', 'Region', 'GACC']
+
+def keyed_rows(rows):
+    """
+    {(key, occurrence): row}, numbering repeated keys in document order.
+    """
+    keyed = {}
+    seen = {}
+    for row in rows:
+        key = name_key(row)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        keyed[(key, occurrence)] = row
+    return keyed
+
+def row_deltas(previous, current):
+    """
+    {column: {'previous', 'current'[, 'delta']}} for every diff column whose value
+    changed. 'delta' is included when both values are numbers.
+    """
+    deltas = {}
+    for column in diff_columns:
+        before, after = previous.get(column), current.get(column)
+        if before == after:
+            continue
+        change = {'previous': before, 'current': after}
+        if isinstance(before, int) and isinstance(after, int):
+            change['delta'] = after - before
+        deltas[column] = change
+    return deltas
+
+def without_date(row):
+    return {column: value for column, value in row.items() if column != 'Date'}
+
+def diff_incidents(previous_rows, current_rows):
+    """
+    Returns {'counts', 'new', 'removed', 'changed'}. new and removed hold the incidents'
+    rows; each changed entry holds the identity columns and the row_deltas.
+    """
+    previous = keyed_rows(previous_rows)
+    new, changed = [], []
+    unchanged = 0
+    for key, row in keyed_rows(current_rows).items():
+        before = previous.pop(key, None)
+        if before is None:
+            new.append(without_date(row))
+            continue
+        deltas = row_deltas(before, row)
+        if not deltas:
+            unchanged += 1
+            continue
+        entry = {column: row.get(column) for column in identity_columns}
+        entry['deltas'] = deltas
+        changed.append(entry)
+    removed = [without_date(row) for row in previous.values()]
+    return {
+        'counts': {'new': len(new), 'removed': len(removed), 'changed': len(changed), 'unchanged': unchanged},
+        'new': new,
+        'removed': removed,
+        'changed': changed,
+    }
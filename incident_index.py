@@ -0,0 +1,161 @@
+import json
+import os
+import re
+from datetime import datetime
+from json_files import atomic_file, load_json, write_json
+
+# Links the same fire across daily reports and keeps one history file per incident.
+#
+# incidents/incident_index.json holds the match keys and a small record per incident;
+# incidents/<incident_id>.jsonl gets one typed row appended per report date. An
+# incident's growth curve is then a single fetch instead of a scan of every Region file.
+#
+# Matching, in order:
+#   1. Unit + Est + normalized name (the exact key)
+#   2. Unit + normalized name (the containment estimate was revised)
+#   3. Unit + Est, when exactly one incident with that pair was in the previous
+#      report and has not been matched yet (the fire was renamed, e.g. merged into a complex)
+# Keys 1 and 2 only match an incident last seen within match_window_days of the report:
+# fire names repeat within a unit from season to season (and Est is often UNK), so an
+# older incident with the same key is a different fire.
+
+match_window_days = 30
+
+index_filename = 'incident_index.json'
+
+def normalize_name(name):
+    """
+    '* Rochelle 2 ' -> 'rochelle 2'. Drops the new-incident marker, punctuation and case.
+    """
+    name = re.sub(r'[^0-9a-z]+', ' ', name.lower())
+    return ' '.join(name.split())
+
+def exact_key(row):
+    return f"{row.get('Unit') or ''}|{row.get('Est') or ''}|{normalize_name(row.get('Incident Name') or '')}"
+
+def name_key(row):
+    return f"{row.get('Unit') or ''}|{normalize_name(row.get('Incident Name') or '')}"
+
+def est_key(row):
+    return f"{row.get('Unit') or ''}|{row.get('Est') or ''}"
+
+def incident_id_for(row, report_date):
+    """
+    Stable, filename-safe id from the unit, name and first report date.
+    """
+    slug = normalize_name(row.get('Incident Name') or '').replace(' ', '-') or 'unnamed'
+    unit = re.sub(r'[^0-9A-Za-z-]+', '', row.get('Unit') or '') or 'UNK'
+    return f'{unit}_{slug}_{report_date}'
+
+def load_index(incidents_dir):
+    index = load_json(os.path.join(incidents_dir, index_filename))
+    if index is None:
+        return {'exact': {}, 'name': {}, 'incidents': {}, 'last_date': None}
+    return index
+
+def save_index(incidents_dir, index):
+    write_json(os.path.join(incidents_dir, index_filename), index, compact=True)
+
+def days_between(date_a, date_b):
+    return abs((datetime.strptime(date_a, '%Y%m%d') - datetime.strptime(date_b, '%Y%m%d')).days)
+
+def match_incidents(index, rows, report_date):
+    """
+    Returns [(incident_id, row)] for the day's rows, creating ids for new incidents
+    and updating the index's keys in place.
+    """
+    incidents = index['incidents']
+    previous_date = index.get('last_date')
+
+    def recent(incident_id):
+        # Reruns and out-of-order backfills may fall inside or before the seen span
+        record = incidents[incident_id]
+        first_seen = record['first_seen']
+        last_seen = record['last_seen'] or first_seen
+        if first_seen <= report_date <= last_seen:
+            return True
+        nearest = last_seen if report_date > last_seen else first_seen
+        return days_between(nearest, report_date) <= match_window_days
+    # Fallback 3 candidates: incidents from the previous report, grouped by Unit + Est
+    by_est = {}
+    for incident_id, record in incidents.items():
+        if record['last_seen'] == previous_date:
+            by_est.setdefault(record['est_key'], []).append(incident_id)
+
+    # Exact and name matches first, so a renamed fire cannot claim an incident
+    # that another row of the same day matches directly
+    ids = [None] * len(rows)
+    used = set()
+    for i, row in enumerate(rows):
+        for incident_id in (index['exact'].get(exact_key(row)), index['name'].get(name_key(row))):
+            if incident_id is not None and incident_id not in used and recent(incident_id):
+                ids[i] = incident_id
+                used.add(incident_id)
+                break
+    for i, row in enumerate(rows):
+        if ids[i] is not None:
+            continue
+        candidates = [c for c in by_est.get(est_key(row), []) if c not in used]
+        if len(candidates) == 1 and row.get('Est'):
+            incident_id = candidates[0]
+        else:
+            incident_id = incident_id_for(row, report_date)
+            # Two new fires with the same unit and name on one day
+            suffix = 2
+            while incident_id in incidents or incident_id in used:
+                incident_id = f'{incident_id_for(row, report_date)}-{suffix}'
+                suffix += 1
+            incidents[incident_id] = {'first_seen': report_date, 'last_seen': None}
+        ids[i] = incident_id
+        used.add(incident_id)
+
+    matched = []
+    for incident_id, row in zip(ids, rows):
+        record = incidents[incident_id]
+        record.update({
+            'name': row.get('Incident Name'),
+            'unit': row.get('Unit'),
+            'gacc': row.get('GACC'),
+            'est_key': est_key(row),
+        })
+        index['exact'][exact_key(row)] = incident_id
+        index['name'][name_key(row)] = incident_id
+        matched.append((incident_id, row))
+    return matched
+
+def append_history(incidents_dir, incident_id, record, row, report_date):
+    """
+    Appends the day's row to the incident's history file. A date at or before the
+    last one recorded (a rerun or out-of-order backfill) rewrites the file instead,
+    keeping one row per date in date order.
+    """
+    path = os.path.join(incidents_dir, f'{incident_id}.jsonl')
+    line = json.dumps(row, separators=(',', ':'))
+    last_seen = record.get('last_seen')
+    if last_seen is None or report_date > last_seen or not os.path.exists(path):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+        record['last_seen'] = report_date
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        existing = [json.loads(l) for l in f if l.strip()]
+    existing = [r for r in existing if r.get('Date') != report_date] + [row]
+    existing.sort(key=lambda r: r.get('Date') or '')
+    with atomic_file(path) as f:
+        for r in existing:
+            f.write(json.dumps(r, separators=(',', ':')) + '\n')
+
+def update_incident_index(incidents_dir, report_date, rows):
+    """
+    Matches the day's typed incident rows (each carrying 'Date') against the index
+    and appends one row to each incident's history file. Returns {incident_id: row}.
+    """
+    os.makedirs(incidents_dir, exist_ok=True)
+    index = load_index(incidents_dir)
+    matched = match_incidents(index, rows, report_date)
+    for incident_id, row in matched:
+        append_history(incidents_dir, incident_id, index['incidents'][incident_id], row, report_date)
+    if index.get('last_date') is None or report_date > index['last_date']:
+        index['last_date'] = report_date
+    save_index(incidents_dir, index)
+    return dict(matched)
@@ -1,5 +1,5 @@
 #!/bin/bash
 cd ~/fire_project/Fire_Project
 source ~/fire_project/venv/bin/activate
-python3.12 ~/fire_project/Fire_Project/Fire_Sample.py
+python3.12 ~/fire_project/Fire_Project/Fire_Sample.py --compact --precompress
 deactivate
@@ -0,0 +1,43 @@
+import json
+import os
+from contextlib import contextmanager
+
+# Every file the pipeline rewrites in place (the per-day outputs, the incident index and
+# history files, season rollups and leaderboards, run metrics, daemon status) is written
+# to a temp file beside it and renamed over it, so a reader or a crash mid-write never
+# sees a partial file.
+
+@contextmanager
+def atomic_file(path):
+    """
+    A text file to write path's new content to; it replaces path when the block exits
+    cleanly and is removed otherwise.
+    """
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def load_json(path, default=None):
+    """
+    The JSON document at path, or default when there is none.
+    """
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_json(path, data, compact=False):
+    """
+    Writes data as JSON: indented by default, minified (no whitespace) when compact.
+    """
+    with atomic_file(path) as f:
+        if compact:
+            json.dump(data, f, separators=(',', ':'))
+        else:
+            json.dump(data, f, indent=2)
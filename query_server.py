@@ -0,0 +1,454 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict
+from functools import partial
+from urllib.parse import parse_qsl, urlsplit
+
+import Fire_Sample as fs
+import text_index
+
+# Read-only JSON query service over the published days in data/<YYYYMMDD>, so filters
+# like "fires over 10k acres in SWCC" or "last 14 days of personnel for NRCC" are
+# answered server-side instead of after downloading every file.
+#
+# One asyncio event loop serves every connection (HTTP/1.1 keep-alive, GET/HEAD only).
+# Each day's typed incident and GACC summary rows are loaded once, in a worker thread,
+# into an LRU cache keyed by date; concurrent requests for a day that is still loading
+# wait on the same load. The data directory is rescanned at most every --refresh
+# seconds (or on SIGHUP): newly published days appear, and a cached day whose bundle
+# changed (publish_outputs only replaces files whose content changed) is reloaded.
+# Searches query the text index in the history database (see text_index) directly.
+# Encoded responses are also kept, per request target, until the published days change
+# (--response-cache of them, least recently used first out; 0 disables).
+#
+#   GET /days                     published days
+#   GET /incidents                incident rows, filtered and paginated (see query_incidents)
+#   GET /summary                  GACC summary rows (see query_summary)
+#   GET /search                   discussions and narratives matching q (see query_search)
+#   GET /stats                    cache state
+
+default_cache_days = 64
+response_cache_size = 512
+default_page_size = 100
+max_page_size = 1000
+
+# The typed row columns a query may sort on
+sort_columns = ['Date', 'GACC', 'Region', 'Incident Name', 'Unit'] + list(fs.region_column_types)
+summary_sort_columns = ['Date', 'GACC'] + list(fs.summary_column_types)
+
+def day_signature(day_dir):
+    """
+    (mtime_ns, size) of the day's bundle (or region key, for days written before
+    bundles existed); None when the folder holds no finished day.
+    """
+    name = os.path.basename(day_dir)
+    for path in (os.path.join(day_dir, f'bundle_{name}.json'),
+                 os.path.join(day_dir, 'regions', f'region_key_{name}.json')):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        return (stat.st_mtime_ns, stat.st_size)
+    return None
+
+# Signature key of the history database holding the text index; never a date
+search_key = 'search'
+
+def search_signature(history_path):
+    """
+    (mtime_ns, size) of the history database and its write-ahead log, which takes
+    every write until a checkpoint; None when there is no database.
+    """
+    signature = []
+    for path in (history_path, f'{history_path}-wal'):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if path == history_path:
+                return None
+            continue
+        signature += [stat.st_mtime_ns, stat.st_size]
+    return tuple(signature)
+
+def search_history(history_path, output_root, query, start, end, source, limit, offset):
+    """
+    Runs text_index.search on its own read-only connection, so searches can run in
+    worker threads.
+    """
+    conn = text_index.open_index(history_path)
+    try:
+        return text_index.search(conn, query, output_root, start, end, source, limit, offset)
+    finally:
+        conn.close()
+
+def load_day(output_root, day):
+    """
+    A cache entry for one published day: its typed incident rows (see
+    Fire_Sample.incident_rows), indexed by GACC, and its typed GACC summary rows.
+    """
+    report = fs.load_day_report(os.path.join(output_root, day))
+    rows, summary = [], []
+    if report is not None:
+        rows = fs.incident_rows(report)
+        summary = [dict(row, Date=report['date']) for row in report['typed_summary']]
+    by_gacc = {}
+    for row in rows:
+        by_gacc.setdefault(row['GACC'], []).append(row)
+    return {'rows': rows, 'by_gacc': by_gacc, 'summary': summary}
+
+def new_state(output_root, cache_days=default_cache_days, refresh_seconds=2.0, history_path=None,
+              response_cache=response_cache_size):
+    return {
+        'root': output_root,
+        'history': history_path or os.path.join(output_root, 'history.sqlite'),
+        'cache_days': cache_days,
+        'refresh_seconds': refresh_seconds,
+        'checked': None,
+        'days': [],
+        'signatures': {},
+        'cache': OrderedDict(),
+        'loading': {},
+        'responses': OrderedDict(),
+        'response_cache': response_cache,
+        'response_hits': 0,
+        'hits': 0,
+        'misses': 0,
+    }
+
+def refresh_days(state, force=False):
+    """
+    Rescans the data directory when the last scan is older than refresh_seconds (or
+    when forced), and drops cached days that were removed or republished. Encoded
+    responses are dropped when any day or the history database changed.
+    """
+    now = time.monotonic()
+    if not force and state['checked'] is not None and now - state['checked'] < state['refresh_seconds']:
+        return
+    state['checked'] = now
+    try:
+        names = os.listdir(state['root'])
+    except FileNotFoundError:
+        names = []
+    signatures = {}
+    for name in names:
+        if len(name) == 8 and name.isdigit():
+            signature = day_signature(os.path.join(state['root'], name))
+            if signature is not None:
+                signatures[name] = signature
+    signature = search_signature(state['history'])
+    if signature is not None:
+        signatures[search_key] = signature
+    if signatures == state['signatures']:
+        return
+    state['signatures'] = signatures
+    state['days'] = sorted(key for key in signatures if key != search_key)
+    state['responses'].clear()
+    cache = state['cache']
+    for day in [day for day, entry in cache.items() if entry['signature'] != signatures.get(day)]:
+        del cache[day]
+
+def finish_load(state, day, signature, future):
+    del state['loading'][day]
+    if future.cancelled() or future.exception() is not None:
+        return
+    if state['signatures'].get(day) != signature:
+        # Republished while loading; the next request loads it again
+        return
+    entry = future.result()
+    entry['signature'] = signature
+    cache = state['cache']
+    cache[day] = entry
+    while len(cache) > state['cache_days']:
+        cache.popitem(last=False)
+
+async def get_day(state, day, load=load_day):
+    """
+    The cache entry for a published day (see load_day), loading it in a worker thread
+    on a miss. Every request for a day that is already loading waits on that load.
+    """
+    entry = state['cache'].get(day)
+    if entry is not None:
+        state['cache'].move_to_end(day)
+        state['hits'] += 1
+        return entry
+    pending = state['loading'].get(day)
+    if pending is None:
+        state['misses'] += 1
+        pending = asyncio.ensure_future(asyncio.to_thread(load, state['root'], day))
+        state['loading'][day] = pending
+        pending.add_done_callback(partial(finish_load, state, day, state['signatures'].get(day)))
+    # A client that disconnects must not cancel the load for everyone else
+    return await asyncio.shield(pending)
+
+def int_param(params, name, default=None, minimum=None, maximum=None):
+    value = params.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer') from None
+    if minimum is not None and value < minimum:
+        raise ValueError(f'{name} must be at least {minimum}')
+    if maximum is not None and value > maximum:
+        raise ValueError(f'{name} must be at most {maximum}')
+    return value
+
+def date_param(params, name):
+    value = params.get(name)
+    if value is None or value == '':
+        return None
+    value = value.replace('-', '')
+    if len(value) != 8 or not value.isdigit():
+        raise ValueError(f'{name} must be a date (YYYYMMDD or YYYY-MM-DD)')
+    return value
+
+def select_days(state, params):
+    """
+    The published days a query covers: those between start and end (inclusive), the
+    last `days` of them when given. Without any of the three, the latest day only.
+    """
+    start, end = date_param(params, 'start'), date_param(params, 'end')
+    last = int_param(params, 'days', minimum=1)
+    days = state['days']
+    if start is None and end is None and last is None:
+        return days[-1:]
+    days = [day for day in days if (start is None or day >= start) and (end is None or day <= end)]
+    if last is not None:
+        days = days[-last:]
+    return days
+
+def sort_rows(rows, params, columns):
+    """
+    Sorts by the 'sort' column ('-Total Acres' for descending); rows without a value
+    sort last either way. Without 'sort' rows stay in date and report order.
+    """
+    sort = params.get('sort')
+    if not sort:
+        return rows
+    descending = sort.startswith('-')
+    column = sort.lstrip('-')
+    if column not in columns:
+        raise ValueError(f"sort must be one of: {', '.join(columns)} (prefix '-' for descending)")
+    present = [row for row in rows if row.get(column) is not None]
+    present.sort(key=lambda row: row[column], reverse=descending)
+    return present + [row for row in rows if row.get(column) is None]
+
+def paginate(rows, days, params):
+    limit = int_param(params, 'limit', default_page_size, minimum=1, maximum=max_page_size)
+    offset = int_param(params, 'offset', 0, minimum=0)
+    page = rows[offset:offset + limit]
+    return {
+        'days': days,
+        'total': len(rows),
+        'offset': offset,
+        'limit': limit,
+        'next_offset': offset + limit if offset + limit < len(rows) else None,
+        'rows': page,
+    }
+
+def gacc_param(params):
+    value = params.get('gacc')
+    if not value:
+        return None
+    return [code.strip().upper() for code in value.split(',') if code.strip()]
+
+async def query_days(state, params):
+    return {'days': state['days'], 'latest': state['days'][-1] if state['days'] else None}
+
+async def query_incidents(state, params):
+    """
+    Incident rows of the selected days (see select_days). Filters: gacc (comma-separated
+    codes), region and name (case-insensitive substrings), min_acres / max_acres
+    (Total Acres). Then sort and limit / offset (see sort_rows, paginate).
+    """
+    days = select_days(state, params)
+    gaccs = gacc_param(params)
+    region = (params.get('region') or '').lower()
+    name = (params.get('name') or '').lower()
+    min_acres = int_param(params, 'min_acres')
+    max_acres = int_param(params, 'max_acres')
+    rows = []
+    for day in days:
+        entry = await get_day(state, day)
+        if gaccs is None:
+            candidates = entry['rows']
+        else:
+            candidates = [row for gacc in gaccs for row in entry['by_gacc'].get(gacc, ())]
+        for row in candidates:
+            if region and region not in row['Region'].lower():
+                continue
+            if name and name not in (row.get('Incident Name') or '').lower():
+                continue
+            if min_acres is not None or max_acres is not None:
+                acres = row.get('Total Acres')
+                if acres is None:
+                    continue
+                if (min_acres is not None and acres < min_acres) or (max_acres is not None and acres > max_acres):
+                    continue
+            rows.append(row)
+    return paginate(sort_rows(rows, params, sort_columns), days, params)
+
+async def query_summary(state, params):
+    """
+    GACC summary rows of the selected days, filtered by gacc; sorted and paginated as
+    query_incidents.
+    """
+    days = select_days(state, params)
+    gaccs = gacc_param(params)
+    rows = []
+    for day in days:
+        entry = await get_day(state, day)
+        rows.extend(row for row in entry['summary'] if gaccs is None or row['GACC'] in gaccs)
+    return paginate(sort_rows(rows, params, summary_sort_columns), days, params)
+
+async def query_search(state, params):
+    """
+    Predictive discussions and region narratives matching q (see text_index.search),
+    newest first. Filters: start / end (dates), source (substring); limit / offset.
+    """
+    query = params.get('q') or ''
+    if not query.strip():
+        raise ValueError('q is required')
+    if state['signatures'].get(search_key) is None:
+        return {'query': query, 'total': 0, 'results': []}
+    limit = int_param(params, 'limit', 20, minimum=1, maximum=max_page_size)
+    offset = int_param(params, 'offset', 0, minimum=0)
+    return await asyncio.to_thread(search_history, state['history'], state['root'], query,
+                                   date_param(params, 'start'), date_param(params, 'end'), params.get('source'),
+                                   limit, offset)
+
+async def query_stats(state, params):
+    return {
+        'days': len(state['days']),
+        'cached_days': list(state['cache']),
+        'cache_days': state['cache_days'],
+        'loading': list(state['loading']),
+        'hits': state['hits'],
+        'misses': state['misses'],
+        'cached_responses': len(state['responses']),
+        'response_hits': state['response_hits'],
+    }
+
+routes = {
+    '/days': query_days,
+    '/incidents': query_incidents,
+    '/summary': query_summary,
+    '/search': query_search,
+    '/stats': query_stats,
+}
+
+status_reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  500: 'Internal Server Error'}
+
+async def respond(state, method, target):
+    """
+    Returns (status, JSON body bytes) for one request.
+    """
+    if method not in ('GET', 'HEAD'):
+        return 405, b'{"error":"only GET and HEAD are supported"}'
+    url = urlsplit(target)
+    route = routes.get(url.path.rstrip('/'))
+    if route is None:
+        return 404, json.dumps({'error': 'not found', 'routes': sorted(routes)}).encode()
+    refresh_days(state)
+    responses = state['responses']
+    body = responses.get(target)
+    if body is not None:
+        responses.move_to_end(target)
+        state['response_hits'] += 1
+        return 200, body
+    signatures = state['signatures']
+    try:
+        result = await route(state, dict(parse_qsl(url.query)))
+    except ValueError as e:
+        return 400, json.dumps({'error': str(e)}).encode()
+    except Exception as e:
+        print(f'{target}: {type(e).__name__}: {e}', file=sys.stderr)
+        return 500, b'{"error":"internal error"}'
+    body = json.dumps(result, separators=(',', ':')).encode()
+    # Not cached when the data was republished while the query waited on a load
+    if route is not query_stats and state['response_cache'] and state['signatures'] is signatures:
+        responses[target] = body
+        if len(responses) > state['response_cache']:
+            responses.popitem(last=False)
+    return 200, body
+
+async def handle_connection(state, reader, writer):
+    """
+    Serves requests on one connection until the client closes it or asks to.
+    """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3:
+                status, body, method, keep_alive = 400, b'{"error":"malformed request"}', 'GET', False
+            else:
+                method, target, version = parts
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                length = int(headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+                status, body = await respond(state, method, target)
+            head = (f'HTTP/1.1 {status} {status_reasons[status]}\r\n'
+                    'Content-Type: application/json\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode()
+            writer.write(head if method == 'HEAD' else head + body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        # Dropped connections, oversized lines and bad Content-Length headers
+        pass
+    finally:
+        writer.close()
+
+async def serve(args):
+    state = new_state(args.data, args.cache_days, args.refresh, args.history, args.response_cache)
+    refresh_days(state, force=True)
+    server = await asyncio.start_server(partial(handle_connection, state), args.host, args.port, backlog=1024)
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    if hasattr(signal, 'SIGHUP'):
+        loop.add_signal_handler(signal.SIGHUP, partial(refresh_days, state, True))
+    print(f"Serving {len(state['days'])} days from {args.data} on http://{args.host}:{args.port}", flush=True)
+    async with server:
+        await stop.wait()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve filtered JSON queries over the published report data.')
+    parser.add_argument('--data', default='data', help='root of the dated output folders (default: data)')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8081, help='port to listen on (default: 8081)')
+    parser.add_argument('--cache-days', type=int, default=default_cache_days,
+                        help=f'days kept in memory (default: {default_cache_days})')
+    parser.add_argument('--response-cache', type=int, default=response_cache_size,
+                        help=f'encoded responses kept, per request target (default: {response_cache_size}; 0 disables)')
+    parser.add_argument('--history', default=None,
+                        help='history database holding the text index (default: <data>/history.sqlite)')
+    parser.add_argument('--refresh', type=float, default=2.0,
+                        help='seconds between checks for newly published days (default: 2)')
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import heapq
+import os
+from json_files import load_json, write_json
+
+# Top-K leaderboards of the typed incident rows (see Fire_Sample.incident_rows) for the
+# questions asked most: largest fires, fastest growing today, most personnel, most
+# expensive and most structures lost.
+#
+# top_<date>.json ranks the day's incidents across all regions (heapq.nlargest, so a
+# day costs O(n log K) instead of a sort of every region file). rankings/season_<year>.json
+# ranks every incident of the season by its peak value of each metric (e.g. its largest
+# single-day growth). A peak never goes down, so an incident that drops out of a top K
+# can never need its old value again: the season state is just the K-entry min-heap per
+# metric, and each day is folded in with O(log K) work per incident.
+
+ranking_metrics = ['Total Acres', 'Chge in Acres', 'Total PPL', '$$ CTD', 'Strc Lost']
+top_k = 10
+entry_columns = ['Incident Name', 'Unit', 'GACC', 'Region']
+
+def ranking_entry(row, metric):
+    entry = {column: row.get(column) for column in entry_columns}
+    entry['value'] = row[metric]
+    return entry
+
+def daily_rankings(report_date, rows, k=top_k):
+    """
+    The top_<date>.json document: the k incidents with the highest value of each
+    metric (rows without a value are left out), highest first.
+    """
+    rankings = {}
+    for metric in ranking_metrics:
+        ranked = heapq.nlargest(k, (row for row in rows if row.get(metric) is not None), key=lambda row: row[metric])
+        rankings[metric] = [ranking_entry(row, metric) for row in ranked]
+    return {'date': report_date, 'k': k, 'rankings': rankings}
+
+def push_peak(heap, k, incident_id, row, metric, report_date):
+    """
+    Offers one incident's value to a metric's min-heap of (value, incident_id, entry),
+    keeping at most k entries, one per incident, at the incident's peak.
+    """
+    value = row.get(metric)
+    if value is None:
+        return
+    for i, (held, held_id, _) in enumerate(heap):
+        if held_id == incident_id:
+            if value > held:
+                entry = ranking_entry(row, metric)
+                entry['date'] = report_date
+                heap[i] = (value, incident_id, entry)
+                heapq.heapify(heap)
+            return
+    if len(heap) >= k and (value, incident_id) <= heap[0][:2]:
+        return
+    entry = ranking_entry(row, metric)
+    entry['date'] = report_date
+    if len(heap) < k:
+        heapq.heappush(heap, (value, incident_id, entry))
+    else:
+        heapq.heapreplace(heap, (value, incident_id, entry))
+
+def update_season_rankings(rankings_dir, report_date, matched, k=top_k):
+    """
+    Folds a day's incidents ({incident_id: typed row}, see
+    incident_index.update_incident_index) into the season leaderboards of the
+    report's year. Returns the season document.
+    """
+    os.makedirs(rankings_dir, exist_ok=True)
+    season = report_date[:4]
+    path = os.path.join(rankings_dir, f'season_{season}.json')
+    heaps = {metric: [] for metric in ranking_metrics}
+    last_date = None
+    saved = load_json(path)
+    if saved is not None and saved.get('k') == k:
+        last_date = saved['last_date']
+        for metric, entries in saved['rankings'].items():
+            if metric in heaps:
+                heaps[metric] = [(entry['value'], entry['incident_id'], entry) for entry in entries]
+                heapq.heapify(heaps[metric])
+    for incident_id, row in matched.items():
+        for metric, heap in heaps.items():
+            push_peak(heap, k, incident_id, row, metric, report_date)
+    season_rankings = {
+        'season': season,
+        'last_date': max(last_date or report_date, report_date),
+        'k': k,
+        'rankings': {
+            metric: [dict(entry, incident_id=incident_id) for _, incident_id, entry in sorted(heap, reverse=True)]
+            for metric, heap in heaps.items()
+        },
+    }
+    write_json(path, season_rankings, compact=True)
+    return season_rankings
@@ -0,0 +1,95 @@
+import os
+from itertools import product
+from json_files import load_json, write_json
+
+# Rollup cube of the typed incident rows (see Fire_Sample.incident_rows) by GACC, owning
+# agency ('Origin Own') and containment status ('Ctn/Comp'): the incident count and the
+# sum of each measure column for every combination of the three, including the '*'
+# (all values) rollups. A breakdown is then a single lookup in 'cells', keyed by the
+# dimension values joined with '|':
+#
+#   cells['SWCC|*|*']   all SWCC incidents
+#   cells['*|FS|Ctn']   contained Forest Service incidents, nationally
+#   cells['*|*|*']      national totals
+#
+# rollup_<date>.json holds a day's cube. rollups/season_<year>.json holds the season to
+# date: every incident seen that year counted once, with its latest reported row. Each
+# day updates it incrementally, moving only its own incidents' contributions (the old
+# row out, the new row in). The contributions and the cells are kept together in
+# rollups/season_<year>_state.json, written atomically, so the two cannot drift apart;
+# season_<year>.json is the small copy of the cube that views fetch.
+
+dimensions = ['GACC', 'Origin Own', 'Ctn/Comp']
+measures = ['Total Acres', 'Total PPL', 'Crw', 'Eng', 'Heli', 'Strc Lost', '$$ CTD']
+unknown_value = 'UNK'
+
+# For each cell a row counts towards: which dimensions keep their value (the rest are '*')
+rollup_masks = list(product((True, False), repeat=len(dimensions)))
+
+def row_key(row):
+    return [row.get(dimension) or unknown_value for dimension in dimensions]
+
+def row_amounts(row):
+    return [row.get(measure) or 0 for measure in measures]
+
+def cell_keys(key):
+    """
+    ['SWCC', 'FS', 'Ctn'] -> the 8 cell keys the row counts towards, from 'SWCC|FS|Ctn' to '*|*|*'.
+    """
+    return ['|'.join(value if keep else '*' for value, keep in zip(key, mask)) for mask in rollup_masks]
+
+def add_to_cells(cells, key, amounts, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) one incident's amounts in every cell it counts
+    towards. Cells left without incidents are dropped.
+    """
+    for cell_key in cell_keys(key):
+        cell = cells.get(cell_key)
+        if cell is None:
+            cell = cells[cell_key] = dict.fromkeys(['incidents'] + measures, 0)
+        cell['incidents'] += sign
+        for measure, amount in zip(measures, amounts):
+            cell[measure] += sign * amount
+        if cell['incidents'] == 0:
+            del cells[cell_key]
+
+def daily_rollup(report_date, rows):
+    """
+    The rollup_<date>.json document for a day's typed incident rows.
+    """
+    cells = {}
+    for row in rows:
+        add_to_cells(cells, row_key(row), row_amounts(row))
+    return {'date': report_date, 'dimensions': dimensions, 'measures': measures, 'cells': cells}
+
+def update_season_rollup(rollups_dir, report_date, matched):
+    """
+    Folds a day's incidents ({incident_id: typed row}, see
+    incident_index.update_incident_index) into the season cube of the report's year.
+    A row older than the one already counted for an incident (an out-of-order
+    backfill) is ignored. Returns the season cube document.
+    """
+    os.makedirs(rollups_dir, exist_ok=True)
+    season = report_date[:4]
+    state_path = os.path.join(rollups_dir, f'season_{season}_state.json')
+    state = load_json(state_path)
+    if state is None or state['dimensions'] != dimensions or state['measures'] != measures:
+        # First day of the season, or the cube layout changed (rebuild the season with --backfill)
+        state = {'last_date': None, 'dimensions': dimensions, 'measures': measures, 'cells': {}, 'incidents': {}}
+    cells, contributions = state['cells'], state['incidents']
+    for incident_id, row in matched.items():
+        counted = contributions.get(incident_id)
+        if counted is not None:
+            if counted['date'] > report_date:
+                continue
+            add_to_cells(cells, counted['key'], counted['amounts'], -1)
+        key, amounts = row_key(row), row_amounts(row)
+        add_to_cells(cells, key, amounts)
+        contributions[incident_id] = {'date': report_date, 'key': key, 'amounts': amounts}
+    if state['last_date'] is None or report_date > state['last_date']:
+        state['last_date'] = report_date
+    write_json(state_path, state, compact=True)
+    cube = {'season': season, 'last_date': state['last_date'], 'dimensions': dimensions, 'measures': measures,
+            'cells': cells}
+    write_json(os.path.join(rollups_dir, f'season_{season}.json'), cube, compact=True)
+    return cube
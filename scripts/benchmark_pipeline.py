@@ -0,0 +1,204 @@
+"""
+Times Fire_Sample.stream_report, the pipeline every run goes through, and each of its
+stages over real and enlarged reports.
+
+Inputs are the bundled PDFs (reference_material/*.pdf, dist/data/*/*.pdf) and text
+reports built by repeating each report's region sections --scale times, plus
+generated reports of --synthetic sizes (see generate_sitrep.py). Results are
+saved as JSON; with --baseline the run is compared against a saved result and exits
+non-zero when any stage is slower than the baseline by more than --threshold.
+
+    python scripts/benchmark_pipeline.py --save-baseline bench_baseline.json
+    python scripts/benchmark_pipeline.py --baseline bench_baseline.json --threshold 0.15
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import Fire_Sample as fs
+from generate_sitrep import generate_report
+
+default_pdfs = [
+    os.path.join(ROOT_DIR, 'reference_material', '*.pdf'),
+    os.path.join(ROOT_DIR, 'dist', 'data', '*', '*.pdf'),
+]
+
+def enlarge_report(file_text, factor):
+    """
+    Returns the report with its region sections (first area header up to the
+    'Predictive Services' discussion) repeated factor times. Each copy's area names
+    get a 'CopyN' prefix so detect_region sees them as distinct regions.
+    """
+    lines = file_text.splitlines()
+    region_headers = [i for i, line in enumerate(lines) if fs.region_header_pattern.search(line)]
+    if factor <= 1 or not region_headers:
+        return file_text
+    start = region_headers[0]
+    end = next((i for i in range(start, len(lines)) if 'Predictive Services' in lines[i]), len(lines))
+    block = lines[start:end]
+    header_lines = set(i - start for i in region_headers if start <= i < end)
+    copies = []
+    for copy in range(2, factor + 1):
+        copies.extend(f'Copy{copy} {line}' if i in header_lines else line for i, line in enumerate(block))
+    return '\n'.join(lines[:end] + copies + lines[end:]) + '\n'
+
+def time_stage(func, repeat):
+    """
+    Runs func repeat times; returns (result of the last run, [seconds per run]).
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+def benchmark_text(file_text, repeat):
+    """
+    Runs stream_report over one report's lines repeat times, writing to a throwaway
+    directory. Returns {stage: {min, median, runs, cpu_median, peak_rss_kb}} for
+    'stream_report' as a whole and for each stage it records in its metrics, plus size
+    counters.
+    """
+    lines = file_text.splitlines()
+    runs = {}
+    report = None
+    with tempfile.TemporaryDirectory() as out_dir:
+        for _ in range(repeat):
+            metrics = fs.new_metrics('benchmark')
+            start = time.perf_counter()
+            report = fs.stream_report(lines, out_dir, '20000101', metrics=metrics)
+            wall = time.perf_counter() - start
+            runs.setdefault('stream_report', []).append({'wall_s': wall, 'cpu_s': None, 'peak_rss_kb': None})
+            for name, stage in metrics['stages'].items():
+                runs.setdefault(name, []).append(stage)
+
+    stages = {}
+    for name, timings in runs.items():
+        walls = [timing['wall_s'] for timing in timings]
+        cpus = [timing['cpu_s'] for timing in timings if timing['cpu_s'] is not None]
+        rss = [timing['peak_rss_kb'] for timing in timings if timing['peak_rss_kb'] is not None]
+        stages[name] = {
+            'min': min(walls),
+            'median': statistics.median(walls),
+            'runs': len(walls),
+            'cpu_median': statistics.median(cpus) if cpus else None,
+            'peak_rss_kb': max(rss) if rss else None,
+        }
+    return {
+        'lines': len(lines),
+        'bytes': len(file_text.encode('utf-8')),
+        'regions': len(report['regions']),
+        'rows': sum(len(rows) for _, rows in report['regions']),
+        'stages': stages,
+    }
+
+def run_benchmarks(pdf_paths, scales, repeat):
+    results = {}
+    for pdf_path in pdf_paths:
+        name = os.path.relpath(pdf_path, ROOT_DIR)
+        pages, timings = time_stage(lambda: fs.extract_pages_from_pdf(pdf_path, workers=1), repeat)
+        file_text = ''.join([page_text + "\n" for page_text in pages if page_text])
+        result = benchmark_text(file_text, repeat)
+        result['pages'] = len(pages)
+        result['stages']['extraction'] = {
+            'min': min(timings), 'median': statistics.median(timings), 'runs': len(timings),
+        }
+        results[name] = result
+        for factor in scales:
+            if factor > 1:
+                results[f'{name} x{factor} (text)'] = benchmark_text(enlarge_report(file_text, factor), repeat)
+    return results
+
+def run_synthetic_benchmarks(incident_counts, repeat):
+    """
+    Times generated text reports with the given incident counts (one area per 250
+    incidents, header repeated every 40 rows as on multi-page tables).
+    """
+    results = {}
+    for incidents in incident_counts:
+        text = generate_report(regions=max(7, incidents // 250), incidents=incidents, page_break_every=40)
+        results[f'synthetic {incidents} incidents (text)'] = benchmark_text(text, repeat)
+    return results
+
+def compare(results, baseline, threshold, min_delta=0.0005):
+    """
+    Returns a list of (input, stage, baseline seconds, current seconds, ratio) for every
+    stage whose median is more than threshold slower than in the baseline. Slowdowns
+    under min_delta seconds are ignored as timer noise on sub-millisecond stages.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        for stage, timing in result['stages'].items():
+            base_timing = base['stages'].get(stage)
+            if not base_timing or base_timing['median'] <= 0:
+                continue
+            ratio = timing['median'] / base_timing['median']
+            if ratio > 1 + threshold and timing['median'] - base_timing['median'] > min_delta:
+                regressions.append((name, stage, base_timing['median'], timing['median'], ratio))
+    return regressions
+
+def print_results(results):
+    for name, result in results.items():
+        print(f"{name}: {result['lines']} lines, {result['regions']} regions, {result['rows']} rows")
+        for stage, timing in result['stages'].items():
+            print(f"  {stage:<20} median {timing['median'] * 1000:9.3f} ms   min {timing['min'] * 1000:9.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the sitrep parsing pipeline.')
+    parser.add_argument('pdfs', nargs='*', help='PDF reports to benchmark (default: the bundled PDFs)')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 50],
+                        help='region-section repeat factors for the enlarged text reports')
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[],
+                        help='also time generated reports with these incident counts (e.g. 1000 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per stage')
+    parser.add_argument('--out', default='benchmark_results.json', help='where to write this run')
+    parser.add_argument('--baseline', help='saved result to compare against')
+    parser.add_argument('--save-baseline', metavar='PATH', help='also save this run as a baseline')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed slowdown per stage before it counts as a regression (0.10 = 10%%)')
+    parser.add_argument('--min-delta', type=float, default=0.0005,
+                        help='ignore slowdowns smaller than this many seconds')
+    args = parser.parse_args()
+
+    pdf_paths = args.pdfs or sorted(path for pattern in default_pdfs for path in glob.glob(pattern))
+    results = run_benchmarks(pdf_paths, args.scale, args.repeat)
+    results.update(run_synthetic_benchmarks(args.synthetic, args.repeat))
+    print_results(results)
+
+    run = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    fs.write_json(args.out, run)
+    if args.save_baseline:
+        fs.write_json(args.save_baseline, run)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        for name, stage, base, current, ratio in regressions:
+            print(f'REGRESSION {name} {stage}: {base * 1000:.3f} ms -> {current * 1000:.3f} ms ({ratio:.2f}x)')
+        if regressions:
+            sys.exit(1)
+        print(f'No stage slower than {args.threshold:.0%} over the baseline.')
+
+if __name__ == "__main__":
+    main()
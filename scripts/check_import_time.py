@@ -0,0 +1,96 @@
+"""
+Checks that Fire_Sample.py stays cheap to start.
+
+Short text-mode reprocessing jobs launch many processes, so importing the module must
+stay within a time budget and must not load the heavy dependencies that only the PDF,
+download, pool and history code paths need. Both are measured with `python -X importtime`:
+
+  1. `import Fire_Sample`: the module's cumulative import time (median of --runs) must
+     be at most --budget-ms, and none of the deferred modules may be imported.
+  2. A full run over a text report (--no-history, --no-cache; generated unless
+     --text-report is given) must not import any of the deferred modules either.
+
+Exits non-zero on a failure, so it can gate a change the way benchmark_pipeline.py does.
+
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --budget-ms 40 --runs 9
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from generate_sitrep import generate_report
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported lazily by Fire_Sample; text reports must never load them
+deferred_modules = [
+    'requests', 'urllib3', 'PyPDF2', 'sqlite3', 'history_store',
+    'concurrent.futures.process', 'multiprocessing', 'matplotlib', 'numpy',
+]
+
+def importtime(args, cwd):
+    """
+    Runs python -X importtime with args; returns {module: cumulative microseconds}.
+    Bytecode writing is enabled so repeated runs measure warm (cached .pyc) imports,
+    as in production.
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = ROOT_DIR
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=cwd, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the startup cost of Fire_Sample.py.')
+    parser.add_argument('--budget-ms', type=float, default=30.0,
+                        help='allowed cumulative import time of Fire_Sample (default: 30 ms)')
+    parser.add_argument('--runs', type=int, default=7, help='measured imports; the median is checked')
+    parser.add_argument('--text-report',
+                        help='text report for the end-to-end check (default: a generated one, see generate_sitrep.py)')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        # The first import writes the .pyc files the measured runs load
+        importtime(['-c', 'import Fire_Sample'], work_dir)
+        runs = [importtime(['-c', 'import Fire_Sample'], work_dir) for _ in range(args.runs)]
+        median_ms = statistics.median(run['Fire_Sample'] for run in runs) / 1000
+        print(f'import Fire_Sample: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.1f} ms)')
+        if median_ms > args.budget_ms:
+            failures.append(f'import took {median_ms:.1f} ms, over the {args.budget_ms:.1f} ms budget')
+        loaded = sorted(name for name in deferred_modules if name in runs[0])
+        if loaded:
+            failures.append(f'import Fire_Sample loads deferred modules: {", ".join(loaded)}')
+
+        text_report = args.text_report
+        if text_report is None:
+            text_report = os.path.join(work_dir, 'sitrep.txt')
+            with open(text_report, 'w', encoding='utf-8') as f:
+                f.write(generate_report())
+        text_run = importtime([os.path.join(ROOT_DIR, 'Fire_Sample.py'), os.path.abspath(text_report),
+                               '--no-history', '--no-cache', '--output-root', os.path.join(work_dir, 'data')],
+                              work_dir)
+        loaded = sorted(name for name in deferred_modules if name in text_run)
+        print(f'text report run: {len(text_run)} modules imported')
+        if loaded:
+            failures.append(f'a text report run loads deferred modules: {", ".join(loaded)}')
+
+    for failure in failures:
+        print(f'FAIL {failure}')
+    if failures:
+        sys.exit(1)
+    print('Startup within budget.')
+
+if __name__ == "__main__":
+    main()
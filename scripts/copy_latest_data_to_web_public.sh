@@ -19,9 +19,9 @@ fi
 SRC_PATH="$SRC_ROOT/$LATEST_DIR"
 DEST_PATH="$DEST_ROOT/$LATEST_DIR"
 
-mkdir -p "$DEST_ROOT"
-rm -rf "$DEST_PATH"
-cp -a "$SRC_PATH" "$DEST_PATH"
+mkdir -p "$DEST_PATH"
+# rsync swaps each changed file in atomically and leaves unchanged files (and their mtimes) alone
+rsync -a --delete --checksum "$SRC_PATH/" "$DEST_PATH/"
 
 echo "Copied: $SRC_PATH"
 echo "To:     $DEST_PATH"
@@ -0,0 +1,271 @@
+"""
+Writes synthetic Incident Management Situation Reports for scale and stress testing.
+
+The output follows the layout Fire_Sample.py parses: a three-line header, the
+'Active Incident Resource Summary' GACC table, one section per area with its
+'Fire Activity and Teams Assigned' block, narratives and an 'Incident Name ... Own'
+table, then the 'Predictive Services Discussion'. Sizes are configurable well past
+what real reports reach, so superlinear parser behaviour shows up in benchmarks.
+
+    python scripts/generate_sitrep.py --regions 40 --incidents 10000 --out big.txt
+    python scripts/generate_sitrep.py --incidents 2000 --page-break-every 45 --pdf big.pdf
+"""
+import argparse
+import random
+from datetime import date, timedelta
+
+# The ten real GACC areas first; anything beyond gets a synthetic single-word name
+# so the '^[A-Z][a-z]+ Area' and '(PL n)' patterns still match.
+area_names = [
+    ('Alaska', 'AICC'), ('Northwest', 'NWCC'), ('Northern California', 'ONCC'),
+    ('Southern California', 'OSCC'), ('Northern Rockies', 'NRCC'), ('Great Basin', 'GBCC'),
+    ('Southwest', 'SWCC'), ('Rocky Mountain', 'RMCC'), ('Eastern', 'EACC'), ('Southern', 'SACC'),
+]
+
+name_words = [
+    'Cedar', 'Creek', 'Canyon', 'Ridge', 'Mountain', 'Lake', 'Butte', 'Mesa', 'Pine', 'Spring',
+    'Valley', 'Gulch', 'Hollow', 'Peak', 'River', 'Flat', 'Draw', 'Point', 'Meadow', 'Rock',
+    'Elk', 'Bear', 'Eagle', 'Wolf', 'Horse', 'Sage', 'Juniper', 'Aspen', 'Willow', 'Oak',
+]
+owners = ['FS', 'BLM', 'ST', 'PRI', 'CNTY', 'NPS', 'BIA', 'FWS']
+states = ['AZ', 'CA', 'CO', 'ID', 'MT', 'NM', 'NV', 'OR', 'TX', 'UT', 'WA', 'WY', 'AK', 'OK', 'FL']
+
+table_header = [
+    'Incident Name  Unit  Total ',
+    'Acres  Chge in ',
+    'Acres  %  Ctn  Est  Total ',
+    'PPL  Chge in ',
+    'PPL  Crw  Eng  Heli  Strc ',
+    'Lost  $$ CTD  Origin ',
+    'Own  ',
+]
+flat_table_header = ['Incident Name  Unit  Total Acres  Chge in Acres  %  Ctn  Est  Total PPL  '
+                     'Chge in PPL  Crw  Eng  Heli  Strc Lost  $$ CTD  Origin Own  ']
+
+def synthetic_area_name(index):
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord('a') + rem) + letters
+    return f'Region{letters}'
+
+def synthetic_gacc_code(index):
+    code = ''
+    for _ in range(3):
+        index, rem = divmod(index, 26)
+        code = chr(ord('A') + rem) + code
+    return f'Z{code}'
+
+def grouped(value):
+    return f'{value:,}'
+
+def money(rng):
+    amount = rng.choice([0, rng.randint(3, 999) * 1000, rng.randint(10, 600) * 100_000])
+    if amount == 0:
+        return 'NR'
+    if amount >= 1_000_000:
+        return f'{amount / 1_000_000:.1f}M'.replace('.0M', 'M')
+    return f'{amount // 1000}K'
+
+def incident(rng, name_tokens, report_day):
+    tokens = [rng.choice(name_words) for _ in range(rng.randint(1, name_tokens))]
+    if rng.random() < 0.2:
+        tokens.insert(0, '*')
+    acres = rng.randint(100, 250_000)
+    est = report_day + timedelta(days=rng.randint(1, 120))
+    return {
+        'name': ' '.join(tokens),
+        'unit': f'{rng.choice(states)}-{"".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3))}',
+        'acres': acres,
+        'chge_acres': rng.choice(['---', grouped(rng.randint(0, acres // 4))]),
+        'pct': rng.randint(0, 100),
+        'est': rng.choice(['UNK', '---', f'{est.month}/{est.day}']),
+        'ppl': rng.randint(1, 2500),
+        'chge_ppl': rng.choice(['---', str(rng.randint(-300, 300))]),
+        'crw': rng.randint(0, 40),
+        'eng': rng.randint(0, 120),
+        'heli': rng.randint(0, 15),
+        'strc': rng.randint(0, 50),
+        'ctd': money(rng),
+        'own': rng.choice(owners),
+    }
+
+def incident_line(row):
+    return (f"{row['name']}  {row['unit']} {grouped(row['acres'])}  {row['chge_acres']} {row['pct']} Ctn "
+            f"{row['est']} {grouped(row['ppl'])} {row['chge_ppl']} {row['crw']} {row['eng']} {row['heli']} "
+            f"{row['strc']} {row['ctd']}  {row['own']} ")
+
+def narrative(rng, row, lines_per_incident):
+    words = ['Grass', 'and', 'brush.', 'Active', 'fire', 'behavior', 'with', 'wind-driven', 'runs',
+             'and', 'flanking.', 'Structures', 'threatened.', 'Road', 'closures', 'in', 'effect.']
+    lines = [f"{row['name']} , {row['unit']}. Twelve miles southeast of Example, {row['unit'][:2]}. "
+             + ' '.join(rng.choice(words) for _ in range(8)) + ' ']
+    for _ in range(lines_per_incident - 1):
+        lines.append(' '.join(rng.choice(words) for _ in range(14)) + ' ')
+    lines.append(' ')
+    return lines
+
+def generate_report(regions=7, incidents=50, gaccs=10, name_tokens=3, narrative_lines=2,
+                    page_break_every=0, wrap_header=True, predictive_lines=12, report_day=None, seed=0):
+    """
+    Returns a synthetic report as text. incidents are spread round-robin over the
+    regions; each region is assigned a GACC in turn and the summary table totals
+    match the incident rows. page_break_every > 0 repeats the table header every
+    that many rows, the way tables that span PDF pages are extracted.
+    """
+    rng = random.Random(seed)
+    report_day = report_day or date(2026, 7, 15)
+    gacc_codes = [code for _, code in area_names][:gaccs] + [synthetic_gacc_code(i) for i in range(max(0, gaccs - 10))]
+    header_block = table_header if wrap_header else flat_table_header
+
+    region_rows = [[] for _ in range(regions)]
+    for i in range(incidents):
+        region_rows[i % regions].append(incident(rng, name_tokens, report_day))
+
+    totals = {code: [0, 0, 0, 0, 0, 0] for code in gacc_codes}
+    for idx, rows in enumerate(region_rows):
+        code = gacc_codes[idx % len(gacc_codes)]
+        for row in rows:
+            t = totals[code]
+            t[0] += 1
+            t[1] += row['acres']
+            t[2] += row['crw']
+            t[3] += row['eng']
+            t[4] += row['heli']
+            t[5] += row['ppl']
+
+    lines = [
+        'Incident  Management Situation Report  ',
+        f"{report_day.strftime('%A %B')} {report_day.day}, {report_day.year} – 0730 MDT ",
+        'National Preparedness Level 3  ',
+        ' ',
+        ' ',
+        'National Fire Activity:  ',
+        'Fire Activity and Teams Assigned  Totals  ',
+        f'Initial attack activity:  Light ({incidents * 2} fires)  ',
+        f'New large incidents:  {incidents // 10} ',
+        f'Uncontained large fires:  {incidents} ',
+        ' ',
+        ' ',
+        'Active Incident Resource Summary  ',
+        'GACC  Incidents  Cumulative ',
+        'Acres  Crews  Engines  Helicopters  Total ',
+        'Personnel  Change in ',
+        'Personnel  ',
+    ]
+    grand = [0, 0, 0, 0, 0, 0]
+    for code in gacc_codes:
+        t = totals[code]
+        grand = [a + b for a, b in zip(grand, t)]
+        lines.append(f'{code} {t[0]} {grouped(t[1])}  {t[2]} {t[3]} {t[4]} {grouped(t[5])} {rng.randint(-50, 50)} ')
+    lines.append(f'Total  {grand[0]} {grouped(grand[1])}  {grand[2]} {grand[3]} {grand[4]} {grouped(grand[5])}  0 ')
+    lines.extend([' ', '  '])
+
+    for idx, rows in enumerate(region_rows):
+        area = area_names[idx][0] if idx < len(area_names) else synthetic_area_name(idx)
+        lines.extend([
+            f'{area} Area (PL {rng.randint(1, 5)})   ',
+            'Fire Activity and Teams Assigned  Totals  ',
+            f'New fires:  {len(rows) * 3} ',
+            f'New large incidents:  {len(rows) // 3} ',
+            f'Uncontained large fires:  {len(rows)} ',
+            ' ',
+        ])
+        for row in rows:
+            lines.extend(narrative(rng, row, narrative_lines))
+        lines.extend(header_block)
+        for count, row in enumerate(rows, 1):
+            lines.append(incident_line(row))
+            if page_break_every and count % page_break_every == 0 and count < len(rows):
+                lines.extend(header_block)
+        lines.extend([' ', ' '])
+
+    lines.extend(['Predictive Services Discussion:  ', ' '])
+    sentences = ['Breezy southwest winds 15-25 mph with gusts to 35 mph amid relative humidity of 5-15% ',
+                 'will continue across much of the region creating elevated to critical conditions. ',
+                 'Scattered dry thunderstorms are expected with isolated red flag conditions. ']
+    lines.extend(rng.choice(sentences) for _ in range(predictive_lines))
+    lines.append('6 Minutes for Safety topics can be found here.')
+    return '\n'.join(lines) + '\n'
+
+def pdf_string(text):
+    data = text.encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+def write_pdf(text, path, lines_per_page=60):
+    """
+    Writes the text as a minimal PDF (Helvetica, one text line per report line), so
+    the PyPDF2 extraction path can be exercised without a PDF library.
+    """
+    lines = text.splitlines()
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages_obj = add(None)
+    font = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+    page_ids = []
+    for page_lines in pages:
+        stream = [b'BT /F1 8 Tf 10 TL 24 770 Td']
+        for number, line in enumerate(page_lines):
+            # T* only between lines, so extraction does not add a blank line at each page end
+            stream.append((b'T* ' if number else b'') + b'(' + pdf_string(line) + b') Tj')
+        stream.append(b'ET')
+        content = b'\n'.join(stream)
+        content_id = add(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        page_ids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>' % (pages_obj, font, content_id)
+        ))
+    objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages_obj
+    kids = b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+    objects[pages_obj - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+    return len(pages)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic sitrep for scale testing.')
+    parser.add_argument('--regions', type=int, default=7, help='area sections')
+    parser.add_argument('--incidents', type=int, default=50, help='incident rows across all areas')
+    parser.add_argument('--gaccs', type=int, default=10, help='rows in the resource summary table')
+    parser.add_argument('--name-tokens', type=int, default=3, help='maximum words per incident name')
+    parser.add_argument('--narrative-lines', type=int, default=2, help='narrative lines per incident')
+    parser.add_argument('--page-break-every', type=int, default=0,
+                        help='repeat the table header every N rows (0: never)')
+    parser.add_argument('--flat-header', action='store_true', help='one-line table header instead of the wrapped one')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='synthetic_sitrep.txt', help='text report to write')
+    parser.add_argument('--pdf', help='also write the report as a PDF')
+    parser.add_argument('--lines-per-page', type=int, default=60)
+    args = parser.parse_args()
+
+    text = generate_report(
+        regions=args.regions, incidents=args.incidents, gaccs=args.gaccs, name_tokens=args.name_tokens,
+        narrative_lines=args.narrative_lines, page_break_every=args.page_break_every,
+        wrap_header=not args.flat_header, seed=args.seed,
+    )
+    with open(args.out, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f'{args.out}: {len(text.splitlines())} lines')
+    if args.pdf:
+        print(f'{args.pdf}: {write_pdf(text, args.pdf, args.lines_per_page)} pages')
+
+if __name__ == "__main__":
+    main()
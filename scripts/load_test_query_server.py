@@ -0,0 +1,193 @@
+"""
+Measures query_server.py latency under many concurrent clients.
+
+Each client holds one keep-alive connection and sends --requests queries in turn,
+from a mix of /days, /incidents and /summary queries with randomized days, GACC,
+acreage, sort and page parameters (see query_mix). The mix has more distinct targets
+than the server keeps encoded responses, so the run measures filtering, sorting and
+paging rather than response-cache hits; the hit rate is reported from /stats. With
+--no-response-cache the started server keeps no responses at all. The per-request
+latencies (request written to response body read) are summarized as p50/p90/p99.
+By default a server is started on a data root of --days generated reports (see
+generate_sitrep.py); use --data for an existing data root or --connect for a server
+that is already running. With --max-p99-ms the run exits non-zero over that budget.
+
+    python scripts/load_test_query_server.py --clients 200 --requests 50
+    python scripts/load_test_query_server.py --connect 127.0.0.1:8081 --max-p99-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.request import urlopen
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import Fire_Sample as fs
+from generate_sitrep import area_names, generate_report
+
+query_templates = [
+    '/days',
+    '/incidents?days={days}&offset={offset}&limit=50',
+    '/incidents?gacc={gacc}&min_acres={acres}',
+    '/incidents?days={days}&gacc={gacc}&sort=-Total%20PPL&limit={limit}',
+    '/incidents?days={days}&sort=-Chge%20in%20Acres&offset={offset}&limit=20',
+    '/incidents?days={days}&region={region}&min_acres={acres}&offset={offset}&limit=20',
+    '/summary?days={days}&gacc={gacc}',
+]
+
+def query_mix(count, days, seed=0):
+    """
+    count query targets drawn from query_templates with random parameters over the
+    last `days` published days.
+    """
+    rng = random.Random(seed)
+    return [rng.choice(query_templates).format(
+        days=rng.randint(1, days),
+        offset=rng.randrange(0, 200, 10),
+        limit=rng.choice([10, 20, 50, 100]),
+        acres=rng.randrange(0, 50000, 500),
+        gacc=rng.choice(area_names)[1],
+        region=rng.choice(area_names)[0].split()[0].lower(),
+    ) for _ in range(count)]
+
+def generate_data(output_root, days, incidents):
+    """
+    Publishes days of generated reports (one per date, ending 2026-07-15) under output_root.
+    """
+    last = date(2026, 7, 15)
+    for offset in range(days):
+        day = last - timedelta(days=days - 1 - offset)
+        text = generate_report(regions=7, incidents=incidents, report_day=day, seed=offset)
+        fs.stream_report(text.splitlines(), os.path.join(output_root, day.strftime('%Y%m%d')))
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+async def run_client(host, port, queries, requests, offset, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(requests):
+            query = queries[(offset + i) % len(queries)]
+            started = time.perf_counter()
+            writer.write(f'GET {query} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode())
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(f'{query}: HTTP {status}')
+    finally:
+        writer.close()
+
+async def run_load(host, port, queries, clients, requests):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    # Clients start at disjoint points of the mix, so each target is sent about once
+    results = await asyncio.gather(
+        *(run_client(host, port, queries, requests, i * requests, latencies, errors) for i in range(clients)),
+        return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    errors.extend(f'{type(r).__name__}: {r}' for r in results if isinstance(r, BaseException))
+    return latencies, errors, elapsed
+
+def wait_for_server(host, port, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+
+    async def probe():
+        _, writer = await asyncio.open_connection(host, port)
+        writer.close()
+
+    while True:
+        if process.poll() is not None:
+            sys.exit(f'query_server.py exited with status {process.returncode}')
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                sys.exit(f'query_server.py did not start listening on {host}:{port}')
+            time.sleep(0.1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the query server.')
+    parser.add_argument('--connect', metavar='HOST:PORT', help='test a running server instead of starting one')
+    parser.add_argument('--data', help='data root for the started server (default: generated reports)')
+    parser.add_argument('--days', type=int, default=30, help='generated days (default: 30)')
+    parser.add_argument('--incidents', type=int, default=300, help='incidents per generated day (default: 300)')
+    parser.add_argument('--port', type=int, default=8099, help='port for the started server (default: 8099)')
+    parser.add_argument('--clients', type=int, default=200, help='concurrent connections (default: 200)')
+    parser.add_argument('--requests', type=int, default=25, help='requests per connection (default: 25)')
+    parser.add_argument('--query', action='append', help='query path to send (repeatable; default: a mix)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random query mix (default: 0)')
+    parser.add_argument('--no-response-cache', action='store_true',
+                        help='start the server with its response cache disabled')
+    parser.add_argument('--max-p99-ms', type=float, help='exit non-zero when p99 latency is above this')
+    args = parser.parse_args()
+
+    queries = args.query or query_mix(args.clients * args.requests, args.days, args.seed)
+    with tempfile.TemporaryDirectory() as work_dir:
+        process = None
+        if args.connect:
+            host, _, port = args.connect.rpartition(':')
+            port = int(port)
+        else:
+            host, port = '127.0.0.1', args.port
+            data = args.data
+            if data is None:
+                data = os.path.join(work_dir, 'data')
+                generate_data(data, args.days, args.incidents)
+            command = [sys.executable, os.path.join(ROOT_DIR, 'query_server.py'), '--data', data,
+                       '--host', host, '--port', str(port)]
+            if args.no_response_cache:
+                command += ['--response-cache', '0']
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+            wait_for_server(host, port, process)
+        try:
+            # Load every day first, so cold loads are reported on their own; the measured
+            # targets are not among these, so none of them starts out as a cached response
+            cold, _, _ = asyncio.run(run_load(host, port, ['/days', '/incidents?days=100000&limit=1'], 1, 2))
+            latencies, errors, elapsed = asyncio.run(run_load(host, port, queries, args.clients, args.requests))
+            with urlopen(f'http://{host}:{port}/stats') as response:
+                stats = json.load(response)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    for error in sorted(set(errors))[:10]:
+        print(f'ERROR {error}')
+    if not latencies:
+        sys.exit('no successful requests')
+    latencies.sort()
+    print(f'warm-up: {len(cold)} requests, slowest {max(cold) * 1000:.2f} ms')
+    print(f'{len(latencies)} requests ({len(set(queries))} distinct) from {args.clients} clients in {elapsed:.2f} s '
+          f'({len(latencies) / elapsed:.0f} req/s), {len(errors)} errors')
+    print(f"response cache hits: {stats['response_hits']} of {len(latencies)} requests")
+    p99_ms = percentile(latencies, 0.99) * 1000
+    print(f'latency ms: p50 {percentile(latencies, 0.50) * 1000:.2f}  p90 {percentile(latencies, 0.90) * 1000:.2f}  '
+          f'p99 {p99_ms:.2f}  max {latencies[-1] * 1000:.2f}  mean {statistics.mean(latencies) * 1000:.2f}')
+    if errors:
+        sys.exit(1)
+    if args.max_p99_ms is not None and p99_ms > args.max_p99_ms:
+        print(f'FAIL p99 {p99_ms:.2f} ms is over the {args.max_p99_ms:.2f} ms budget')
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
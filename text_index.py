@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from itertools import accumulate
+from urllib.parse import quote
+
+# Full-text index over the Predictive Services discussions and the region narratives
+# of every ingested day, so a term or phrase ("red flag", "dry lightning", a fire name)
+# is found across the archive without grepping every predictive_summary.txt and
+# region_summaries_<date>.json.
+#
+# The index lives in the history database (see history_store). text_documents has one
+# row per discussion or narrative (report date, the day folder it was published in,
+# source); text_postings has one row per term and document with the term's token
+# positions (gap-encoded) used to match phrases. An ingest inserts only the day's rows,
+# after deleting any earlier run of the same date, and a query reads only the postings
+# of its own terms, so neither grows with the archive. The text itself is not stored:
+# snippets are cut from the day's predictive_summary.txt and region_summaries_<day>.json.
+#
+# Queries: bare words must all appear in a document; "quoted words" must appear as a
+# phrase. Terms are lowercase runs of letters and digits.
+
+token_pattern = re.compile(r'[a-z0-9]+')
+snippet_chars = 80
+predictive_source = 'Predictive Services'
+
+text_tables = [
+    'CREATE TABLE IF NOT EXISTS text_documents '
+    '(doc_id INTEGER PRIMARY KEY, report_date TEXT NOT NULL, day TEXT NOT NULL, source TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS text_documents_date ON text_documents (report_date)',
+    'CREATE TABLE IF NOT EXISTS text_postings '
+    '(term TEXT NOT NULL, doc_id INTEGER NOT NULL, positions TEXT NOT NULL, PRIMARY KEY (term, doc_id)) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS text_postings_doc ON text_postings (doc_id)',
+]
+
+def tokenize(text):
+    return token_pattern.findall(text.lower())
+
+def create_tables(conn):
+    for statement in text_tables:
+        conn.execute(statement)
+
+def has_index(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'text_postings'").fetchone() is not None
+
+def open_index(history_path):
+    """
+    A read-only connection to the history database holding the index.
+    """
+    return sqlite3.connect(f'file:{quote(os.path.abspath(history_path))}?mode=ro', uri=True)
+
+def report_documents(report):
+    """
+    [(source, text)] of a parsed report: 'Predictive Services' and each region header.
+    """
+    documents = [(predictive_source, report.get('predictive') or '')]
+    for region, lines in (report.get('region_summaries') or {}).items():
+        documents.append((region, '\n'.join(lines).strip()))
+    return [(source, text) for source, text in documents if text]
+
+def encode_positions(positions):
+    """
+    [3, 10, 12] -> '3 7 2'.
+    """
+    return ' '.join(map(str, [positions[0]] + [b - a for a, b in zip(positions, positions[1:])]))
+
+def positions_of(encoded):
+    return list(accumulate(map(int, encoded.split())))
+
+def update_text_index(conn, report_date, day, documents):
+    """
+    Replaces report_date's documents in the index of the history database conn with
+    documents ([(source, text)], see report_documents), published in the day folder.
+    """
+    create_tables(conn)
+    with conn:
+        conn.execute('DELETE FROM text_postings WHERE doc_id IN '
+                     '(SELECT doc_id FROM text_documents WHERE report_date = ?)', (report_date,))
+        conn.execute('DELETE FROM text_documents WHERE report_date = ?', (report_date,))
+        for source, text in documents:
+            doc_id = conn.execute('INSERT INTO text_documents (report_date, day, source) VALUES (?, ?, ?)',
+                                  (report_date, day, source)).lastrowid
+            positions = {}
+            for position, token in enumerate(tokenize(text)):
+                positions.setdefault(token, []).append(position)
+            conn.executemany('INSERT INTO text_postings VALUES (?, ?, ?)',
+                             [(term, doc_id, encode_positions(p)) for term, p in positions.items()])
+
+def parse_query(query):
+    """
+    'red flag "dry lightning"' -> [['red'], ['flag'], ['dry', 'lightning']].
+    """
+    phrases = []
+    for quoted, bare in re.findall(r'"([^"]*)"|(\S+)', query):
+        if quoted:
+            tokens = tokenize(quoted)
+            if tokens:
+                phrases.append(tokens)
+        else:
+            phrases.extend([token] for token in tokenize(bare))
+    return phrases
+
+def term_postings(conn, term, start, end, source):
+    """
+    {doc id: encoded positions} and {doc id: report date} of the documents containing
+    term, limited to dates between start and end and to sources containing source.
+    """
+    clauses, params = ['p.term = ?'], [term]
+    if start:
+        clauses.append('d.report_date >= ?')
+        params.append(start)
+    if end:
+        clauses.append('d.report_date <= ?')
+        params.append(end)
+    if source:
+        clauses.append('instr(lower(d.source), ?) > 0')
+        params.append(source.lower())
+    cursor = conn.execute('SELECT p.doc_id, d.report_date, p.positions FROM text_postings p '
+                          f"JOIN text_documents d ON d.doc_id = p.doc_id WHERE {' AND '.join(clauses)}", params)
+    postings, dates = {}, {}
+    for doc_id, report_date, positions in cursor:
+        postings[doc_id] = positions
+        dates[doc_id] = report_date
+    return postings, dates
+
+def phrase_matches(postings, phrase, doc_ids):
+    """
+    {doc id: (number of matches, first match position)} for the doc_ids (None: every
+    document) containing the phrase.
+    """
+    term_postings = [postings[term] for term in phrase]
+    if not all(term_postings):
+        return {}
+    first = term_postings[0]
+    candidates = first.keys() if doc_ids is None else (doc_id for doc_id in doc_ids if doc_id in first)
+    if len(phrase) == 1:
+        # A single word matches at each of its positions; no need to decode them all
+        return {doc_id: (first[doc_id].count(' ') + 1, int(first[doc_id].split(' ', 1)[0]))
+                for doc_id in candidates}
+    matches = {}
+    for doc_id in candidates:
+        if any(doc_id not in p for p in term_postings[1:]):
+            continue
+        starts = positions_of(first[doc_id])
+        for offset, p in enumerate(term_postings[1:], 1):
+            following = set(positions_of(p[doc_id]))
+            starts = [start for start in starts if start + offset in following]
+            if not starts:
+                break
+        if starts:
+            matches[doc_id] = (len(starts), starts[0])
+    return matches
+
+def document_text(output_root, day, source):
+    """
+    The text of one indexed document, read back from the day's published files, or
+    None when they are gone.
+    """
+    day_dir = os.path.join(output_root, day)
+    try:
+        if source == predictive_source:
+            with open(os.path.join(day_dir, 'predictive_summary.txt'), 'r', encoding='utf-8') as f:
+                return f.read()
+        with open(os.path.join(day_dir, 'regions', f'region_summaries_{day}.json'), 'r', encoding='utf-8') as f:
+            lines = json.load(f).get(source)
+    except FileNotFoundError:
+        return None
+    return None if lines is None else '\n'.join(lines).strip()
+
+def snippet(text, position):
+    """
+    The text around the token at position, on one line.
+    """
+    for i, match in enumerate(token_pattern.finditer(text.lower())):
+        if i == position:
+            start = max(0, match.start() - snippet_chars)
+            end = min(len(text), match.end() + snippet_chars)
+            return ('...' if start else '') + ' '.join(text[start:end].split()) + ('...' if end < len(text) else '')
+    return ''
+
+def search(conn, query, output_root='data', start=None, end=None, source=None, limit=20, offset=0):
+    """
+    Documents in the index of the history database conn matching every word and phrase
+    of the query, newest first, optionally limited to dates between start and end
+    (YYYYMMDD, inclusive) and to sources containing source. Returns {'query', 'total',
+    'results'}, each result with its date, source, match count and a snippet around the
+    first match, read from the day folder under output_root.
+    """
+    phrases = parse_query(query)
+    if not phrases or not has_index(conn):
+        return {'query': query, 'total': 0, 'results': []}
+    postings, dates = {}, {}
+    for term in {term for phrase in phrases for term in phrase}:
+        postings[term], term_dates = term_postings(conn, term, start, end, source)
+        dates.update(term_dates)
+    # Rarest phrase first, so every later one only checks the documents still in play
+    phrases.sort(key=lambda phrase: min(len(postings[term]) for term in phrase))
+    matched = None
+    for phrase in phrases:
+        matches = phrase_matches(postings, phrase, None if matched is None else matched.keys())
+        if matched is None:
+            matched = matches
+        else:
+            matched = {
+                doc_id: (matched[doc_id][0] + count, min(matched[doc_id][1], position))
+                for doc_id, (count, position) in matches.items()
+            }
+        if not matched:
+            break
+    hits = sorted(matched, key=lambda doc_id: (dates[doc_id], doc_id), reverse=True)
+    results = []
+    for doc_id in hits[offset:offset + limit]:
+        day, doc_source = conn.execute('SELECT day, source FROM text_documents WHERE doc_id = ?', (doc_id,)).fetchone()
+        text = document_text(output_root, day, doc_source)
+        results.append({
+            'date': dates[doc_id],
+            'source': doc_source,
+            'matches': matched[doc_id][0],
+            'snippet': '' if text is None else snippet(text, matched[doc_id][1]),
+        })
+    return {'query': query, 'total': len(hits), 'results': results}
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the predictive discussions and region narratives.')
+    parser.add_argument('query', help='words that must all appear; quote words to match them as a phrase')
+    parser.add_argument('--history', default=os.path.join('data', 'history.sqlite'),
+                        help='history database holding the index (default: data/history.sqlite)')
+    parser.add_argument('--data', default='data',
+                        help='root of the dated output folders, for snippets (default: data)')
+    parser.add_argument('--start', help='earliest report date (YYYYMMDD)')
+    parser.add_argument('--end', help='latest report date (YYYYMMDD)')
+    parser.add_argument('--source', help="only sources containing this (e.g. 'Predictive', 'Southwest')")
+    parser.add_argument('--limit', type=int, default=20, help='results to show (default: 20)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.history):
+        parser.error(f'no history database at {args.history}')
+    started = time.perf_counter()
+    conn = open_index(args.history)
+    try:
+        found = search(conn, args.query, args.data, args.start, args.end, args.source, args.limit)
+    finally:
+        conn.close()
+    searched = time.perf_counter()
+    for result in found['results']:
+        print(f"{result['date']}  {result['source']}  ({result['matches']})\n    {result['snippet']}")
+    print(f"{found['total']} documents; searched in {(searched - started) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()